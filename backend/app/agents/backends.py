@@ -0,0 +1,241 @@
+import asyncio
+import itertools
+import time
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import TYPE_CHECKING, Any
+
+from app.agents.http import AgentHTTPClient, agent_http
+from app.core.config import OllamaBackend, settings
+
+if TYPE_CHECKING:
+    import httpx
+
+
+def backend_errors() -> tuple[type[Exception], ...]:
+    """Ошибки, после которых запрос повторяется на другом сервере.
+
+    httpx импортируется лениво: к моменту ошибки запроса он уже загружен.
+    """
+    import httpx
+
+    return (httpx.TransportError, httpx.HTTPStatusError)
+
+
+class BackendUnavailableError(Exception):
+    """Нет ни одного доступного LLM-сервера."""
+
+
+class LLMBackend:
+    """Сервер Ollama с автоматом размыкания (circuit breaker).
+
+    После failure_threshold ошибок подряд сервер выводится из ротации на
+    cooldown секунд, затем пропускает один пробный запрос: успех
+    возвращает его в работу, ошибка — снова размыкает.
+    """
+
+    def __init__(
+        self, url: str, model: str, failure_threshold: int, cooldown: float
+    ) -> None:
+        self.url = url.rstrip("/")
+        self.model = model
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.outstanding = 0
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.requests = 0
+        self.errors = 0
+        self.last_used = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def available(self) -> bool:
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self.outstanding)
+
+    def record_success(self) -> None:
+        self.requests += 1
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.requests += 1
+        self.errors += 1
+        self.failures += 1
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "url": self.url,
+            "model": self.model,
+            "state": self.state,
+            "outstanding": self.outstanding,
+            "failures": self.failures,
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+
+class BackendRegistry:
+    """Набор серверов Ollama с балансировкой и переключением при сбоях.
+
+    Запрос уходит на доступный сервер с наименьшим числом незавершённых
+    запросов (при равенстве — на давно не использованный). Если сервер
+    ответил ошибкой или недоступен, запрос повторяется на следующем.
+    """
+
+    def __init__(
+        self,
+        backends: list[OllamaBackend],
+        failure_threshold: int,
+        cooldown: float,
+        http: AgentHTTPClient = agent_http,
+    ) -> None:
+        self.backends = [
+            LLMBackend(b.url, b.model, failure_threshold, cooldown) for b in backends
+        ]
+        self.http = http
+        self._clock = itertools.count(1)
+        self._health_task: asyncio.Task | None = None
+
+    @property
+    def models(self) -> str:
+        """Модели всех серверов (для ключа кэша ответов)."""
+        return ",".join(sorted({backend.model for backend in self.backends}))
+
+    def pick(self, exclude: set[LLMBackend] = frozenset()) -> LLMBackend:
+        """Доступный сервер с наименьшей нагрузкой."""
+        candidates = [b for b in self.backends if b not in exclude and b.available()]
+        if not candidates:
+            raise BackendUnavailableError("No LLM backend available")
+        backend = min(candidates, key=lambda b: (b.outstanding, b.last_used))
+        backend.last_used = next(self._clock)
+        return backend
+
+    def _next(self, tried: set[LLMBackend], last_error: Exception | None) -> LLMBackend:
+        try:
+            backend = self.pick(tried)
+        except BackendUnavailableError as e:
+            raise e from last_error
+        tried.add(backend)
+        return backend
+
+    async def post(
+        self, path: str, payload: dict[str, Any]
+    ) -> tuple[LLMBackend, "httpx.Response"]:
+        """POST с переключением на следующий сервер при ошибке.
+
+        Модель подставляется из настроек выбранного сервера.
+        """
+        tried: set[LLMBackend] = set()
+        last_error = None
+        while True:
+            backend = self._next(tried, last_error)
+            backend.outstanding += 1
+            try:
+                response = await self.http.post(
+                    f"{backend.url}{path}", json={**payload, "model": backend.model}
+                )
+                response.raise_for_status()
+            except backend_errors() as e:
+                backend.record_failure()
+                last_error = e
+                continue
+            finally:
+                backend.outstanding -= 1
+            backend.record_success()
+            return backend, response
+
+    @asynccontextmanager
+    async def stream(
+        self, path: str, payload: dict[str, Any]
+    ) -> AsyncIterator[tuple[LLMBackend, "httpx.Response"]]:
+        """Потоковый POST; переключение возможно только до начала ответа."""
+        tried: set[LLMBackend] = set()
+        last_error = None
+        while True:
+            backend = self._next(tried, last_error)
+            backend.outstanding += 1
+            try:
+                async with AsyncExitStack() as stack:
+                    try:
+                        response = await stack.enter_async_context(
+                            self.http.stream(
+                                "POST",
+                                f"{backend.url}{path}",
+                                json={**payload, "model": backend.model},
+                            )
+                        )
+                        response.raise_for_status()
+                    except backend_errors() as e:
+                        backend.record_failure()
+                        last_error = e
+                        continue
+                    try:
+                        yield backend, response
+                    except backend_errors():
+                        backend.record_failure()
+                        raise
+                    backend.record_success()
+                    return
+            finally:
+                backend.outstanding -= 1
+
+    async def check_health(self) -> None:
+        """Опрос /api/tags всех серверов; недоступные сразу размыкаются."""
+
+        async def check(backend: LLMBackend) -> None:
+            try:
+                response = await self.http.request("GET", f"{backend.url}/api/tags")
+                response.raise_for_status()
+            except backend_errors():
+                backend.failures = backend.failure_threshold
+                backend.opened_at = time.monotonic()
+            else:
+                backend.failures = 0
+                backend.opened_at = None
+
+        await asyncio.gather(*(check(backend) for backend in self.backends))
+
+    async def _health_loop(self, interval: float) -> None:
+        # Первая проверка через interval: на старте HTTP-клиент не создаётся.
+        while True:
+            await asyncio.sleep(interval)
+            await self.check_health()
+
+    async def start(self, interval: float) -> None:
+        """Запуск периодических проверок (из lifespan)."""
+        if interval > 0 and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop(interval))
+
+    async def stop(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+
+    def reset(self) -> None:
+        """Возврат всех серверов в работу со сбросом счётчиков."""
+        for backend in self.backends:
+            backend.outstanding = backend.failures = 0
+            backend.requests = backend.errors = 0
+            backend.opened_at = None
+
+    def stats(self) -> list[dict[str, Any]]:
+        return [backend.stats() for backend in self.backends]
+
+
+agent_backends = BackendRegistry(
+    settings.OLLAMA_BACKENDS
+    or [OllamaBackend(url=settings.OLLAMA_BASE_URL, model=settings.OLLAMA_MODEL)],
+    failure_threshold=settings.AGENT_BACKEND_FAILURE_THRESHOLD,
+    cooldown=settings.AGENT_BACKEND_COOLDOWN_SECONDS,
+)
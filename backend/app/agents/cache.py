@@ -0,0 +1,37 @@
+import hashlib
+import json
+from typing import Any
+
+from app.core.config import settings
+from app.services.cache import SQLiteCache, TTLCache
+
+
+def normalize_text(text: str) -> str:
+    """Текст без различий в регистре и пробельных символах."""
+    return " ".join(text.split()).casefold()
+
+
+def make_cache_key(prompt: str, model: str, params: dict[str, Any]) -> str:
+    """Ключ кэша: sha256 от нормализованного промпта, модели и параметров."""
+    payload = json.dumps(
+        {"prompt": normalize_text(prompt), "model": model, "params": params},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def create_agent_cache() -> TTLCache | SQLiteCache:
+    """Кэш ответов агента по настройкам AGENT_CACHE_*."""
+    if settings.AGENT_CACHE_BACKEND == "sqlite":
+        return SQLiteCache(
+            settings.AGENT_CACHE_PATH,
+            maxsize=settings.AGENT_CACHE_MAXSIZE,
+            ttl=settings.AGENT_CACHE_TTL_SECONDS,
+        )
+    return TTLCache(
+        maxsize=settings.AGENT_CACHE_MAXSIZE, ttl=settings.AGENT_CACHE_TTL_SECONDS
+    )
+
+
+agent_cache = create_agent_cache()
@@ -0,0 +1,150 @@
+import asyncio
+import importlib.util
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any
+
+from app.core.config import settings
+from app.services.http_metrics import timed
+
+if TYPE_CHECKING:
+    import httpx
+
+
+async def _close_on_loop_shutdown(client: "httpx.AsyncClient") -> AsyncGenerator:
+    """Закрытие пула при остановке его цикла.
+
+    asyncio.run закрывает незавершённые асинхронные генераторы, пока цикл ещё
+    работает (shutdown_asyncgens); после закрытия цикла aclose() уже не
+    выполнить, и сокеты жили бы до сборки мусора.
+    """
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+class AgentHTTPClient:
+    """Общий пул HTTP-соединений агентов к LLM-серверу.
+
+    Клиент (и сам httpx) создаётся при первом запросе к LLM, чтобы не
+    замедлять импорт и запуск приложения.
+    """
+
+    def __init__(self, transport: "httpx.AsyncBaseTransport | None" = None) -> None:
+        self._transport = transport
+        self._client: "httpx.AsyncClient | None" = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._closer: AsyncGenerator | None = None
+        self.http2 = importlib.util.find_spec("h2") is not None
+        self.in_flight = 0
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+
+    def _create_client(self) -> "httpx.AsyncClient":
+        import httpx
+
+        self._loop = asyncio.get_running_loop()
+        client = httpx.AsyncClient(
+            base_url=settings.OLLAMA_BASE_URL,
+            transport=self._transport,
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=settings.AGENT_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AGENT_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.AGENT_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                settings.AGENT_HTTP_READ_TIMEOUT,
+                connect=settings.AGENT_HTTP_CONNECT_TIMEOUT,
+            ),
+        )
+        self._closer = _close_on_loop_shutdown(client)
+        asyncio.ensure_future(anext(self._closer))
+        return client
+
+    async def start(self) -> None:
+        """Открытие пула заранее, до первого запроса."""
+        self._get_client()
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        # Соединения привязаны к event loop: при смене цикла (asyncio.run
+        # в скриптах) старый пул использовать нельзя.
+        if self._client is not None and self._loop is not asyncio.get_running_loop():
+            self._retire_client()
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+
+    def _retire_client(self) -> None:
+        """Отказ от пула прежнего цикла.
+
+        Если тот цикл ещё работает (в другом потоке), пул закрывается в нём
+        сразу; остановленный цикл закрыл пул сам при shutdown_asyncgens.
+        """
+        closer, loop = self._closer, self._loop
+        self._client = self._closer = None
+        if closer is not None and loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(closer.aclose(), loop)
+
+    @asynccontextmanager
+    async def stream(
+        self, method: str, url: str, **kwargs: Any
+    ) -> AsyncIterator["httpx.Response"]:
+        """Потоковый запрос через общий пул.
+
+        Новые TCP-соединения отслеживаются через trace-расширение httpcore,
+        остальные запросы считаются ушедшими по keep-alive соединению.
+        """
+        opened = False
+
+        async def trace(event: str, info: dict) -> None:
+            nonlocal opened
+            if event == "connection.connect_tcp.complete":
+                opened = True
+
+        extensions = {**kwargs.pop("extensions", {}), "trace": trace}
+        self.in_flight += 1
+        try:
+            with timed("llm"):
+                async with self._get_client().stream(
+                    method, url, extensions=extensions, **kwargs
+                ) as response:
+                    self.requests += 1
+                    if opened:
+                        self.connections_opened += 1
+                    else:
+                        self.connections_reused += 1
+                    yield response
+        finally:
+            self.in_flight -= 1
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> "httpx.Response":
+        """Запрос через общий пул с полным чтением ответа."""
+        async with self.stream(method, url, **kwargs) as response:
+            await response.aread()
+        return response
+
+    async def post(self, url: str, **kwargs: Any) -> "httpx.Response":
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        """Закрытие пула (вызывается из lifespan)."""
+        if self._client is not None:
+            await self._client.aclose()
+            await self._closer.aclose()
+            self._client = self._closer = None
+
+    def stats(self) -> dict[str, int | bool]:
+        """Счётчики запросов и соединений."""
+        return {
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+            "http2": self.http2,
+        }
+
+
+agent_http = AgentHTTPClient()
@@ -0,0 +1,71 @@
+import json
+import re
+
+from pydantic import ValidationError
+
+from app.agents.streaming import SubtaskStreamParser
+from app.schemas.agent import AgentSplitResult
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+_decoder = json.JSONDecoder()
+
+
+class AgentOutputError(ValueError):
+    """Ответ модели не удалось разобрать даже после починки."""
+
+
+def _repair(text: str) -> dict:
+    """Извлечение JSON из ответа с мусором вокруг или оборванного на середине.
+
+    Снимает markdown-ограждение, отбрасывает текст до первой и после
+    парной последней скобки; у оборванного ответа берёт только полностью
+    сгенерированные подзадачи.
+    """
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    start = text.find("{")
+    if start < 0:
+        raise AgentOutputError("No JSON object in model output")
+    text = text[start:]
+    try:
+        data, _ = _decoder.raw_decode(text)
+        return data
+    except json.JSONDecodeError:
+        pass
+
+    parser = SubtaskStreamParser()
+    subtasks = parser.feed(text)
+    if not subtasks:
+        raise AgentOutputError("Model output is truncated before the first subtask")
+    match = re.search(r'"reasoning_log"\s*:\s*(\[.*?\])', text, re.DOTALL)
+    reasoning_log = []
+    if match:
+        try:
+            reasoning_log = json.loads(match.group(1))
+        except json.JSONDecodeError:
+            pass
+    return {"reasoning_log": reasoning_log, "subtasks": subtasks}
+
+
+def parse_split_output(text: str) -> AgentSplitResult:
+    """Разбор и валидация ответа агента.
+
+    Корректный JSON сразу валидируется pydantic-core без промежуточных
+    объектов; остальное проходит через починку.
+    """
+    try:
+        return AgentSplitResult.model_validate_json(text)
+    except ValidationError as e:
+        if not any(error["type"] == "json_invalid" for error in e.errors()):
+            raise AgentOutputError(_describe(e)) from e
+    try:
+        return AgentSplitResult.model_validate(_repair(text))
+    except ValidationError as e:
+        raise AgentOutputError(_describe(e)) from e
+
+
+def _describe(error: ValidationError) -> str:
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first["loc"])
+    return f"Invalid model output at {location or 'root'}: {first['msg']}"
@@ -1,15 +1,26 @@
+import asyncio
 import json
+import time
+from collections.abc import AsyncIterator
 from typing import Any
 
-import httpx
+from pydantic import ValidationError
 
+from app.agents.backends import agent_backends
+from app.agents.cache import agent_cache, make_cache_key
+from app.agents.parsing import AgentOutputError, parse_split_output
+from app.agents.scheduler import agent_scheduler
+from app.agents.streaming import SubtaskStreamParser
+from app.core.config import settings
+from app.schemas.agent import AgentSubtask
+from app.services.agent_runs import AgentRunStats, agent_run_recorder
 
-async def project_manager_agent(task_description: str) -> dict[str, Any]:
-    """
-    Принимает описание задачи, возвращает разбивку на подзадачи + лог рассуждений.
-    Использует Ollama.
-    """
-    prompt = f"""
+GENERATION_PARAMS = {"stream": False, "format": "json"}
+
+
+def build_prompt(task_description: str) -> str:
+    """Промпт разбивки задачи на подзадачи."""
+    return f"""
 Ты — Project Manager Agent. Пользователь дал задачу:
 
 "{task_description}"
@@ -29,29 +40,129 @@ async def project_manager_agent(task_description: str) -> dict[str, Any]:
 }}
 """
 
+
+def build_reprompt(prompt: str, error: AgentOutputError) -> str:
+    """Повторный промпт после ответа, который не удалось разобрать."""
+    return (
+        f"{prompt}\n"
+        f"Предыдущий ответ не прошёл проверку: {error}.\n"
+        "Верни только JSON строго по формату выше, с непустым списком subtasks."
+    )
+
+
+async def _generate(prompt: str, run: AgentRunStats) -> dict[str, Any]:
+    """Запросы к модели с переспрашиванием при неразборчивом ответе."""
+    request_prompt = prompt
+    for attempt in range(1, settings.AGENT_MAX_ATTEMPTS + 1):
+        backend, response = await agent_backends.post(
+            "/api/generate", {"prompt": request_prompt, **GENERATION_PARAMS}
+        )
+        run.model, run.backend_url = backend.model, backend.url
+        payload = response.json()
+        run.add_ollama_stats(payload)
+        try:
+            return parse_split_output(payload.get("response", "")).model_dump()
+        except AgentOutputError as e:
+            if attempt >= settings.AGENT_MAX_ATTEMPTS:
+                raise
+            request_prompt = build_reprompt(prompt, e)
+
+
+async def project_manager_agent(
+    task_description: str, user_id: int | None = None, task_id: int | None = None
+) -> dict[str, Any]:
+    """
+    Принимает описание задачи, возвращает разбивку на подзадачи + лог рассуждений.
+
+    Использует серверы Ollama из agent_backends, обращения идут через очередь
+    agent_scheduler с учётом user_id. Ответ модели валидируется и при
+    необходимости чинится; если починить не удалось, модель переспрашивается
+    (всего не больше AGENT_MAX_ATTEMPTS запросов). Успешные ответы кэшируются
+    по нормализованному промпту. Каждое обращение к модели записывается
+    в agent_runs.
+
+    Ошибки: AgentOverloadedError — очередь переполнена, BackendUnavailableError —
+    нет доступного сервера, AgentOutputError — ответ так и не прошёл проверку.
+    """
+    prompt = build_prompt(task_description)
+    cache_key = make_cache_key(prompt, agent_backends.models, GENERATION_PARAMS)
+    cached = agent_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    run = AgentRunStats(agent="project_manager", task_id=task_id, user_id=user_id)
+    acquired = False
+    try:
+        async with agent_scheduler.slot(user_id):
+            acquired = True
+            run.queue_seconds = time.perf_counter() - run.started
+            parsed = await _generate(prompt, run)
+    except Exception as e:
+        run.fail(e)
+        raise
+    finally:
+        if acquired:
+            await agent_run_recorder.record(run)
+    agent_cache.set(cache_key, parsed)
+    return parsed
+
+
+async def project_manager_agent_stream(
+    task_description: str, user_id: int | None = None, task_id: int | None = None
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """
+    Потоковая разбивка задачи. Первое событие ("start", {}) — слот в очереди
+    к LLM получен, затем ("subtask", подзадача) по мере генерации и в конце
+    ("done", полный ответ). Ошибки LLM пробрасываются вызывающему.
+    """
+    prompt = build_prompt(task_description)
+    # stream не влияет на ответ модели, поэтому кэш общий с обычной разбивкой.
+    cache_key = make_cache_key(prompt, agent_backends.models, GENERATION_PARAMS)
+    cached = agent_cache.get(cache_key)
+    if cached is not None:
+        yield "start", {}
+        for sub in cached["subtasks"]:
+            yield "subtask", sub
+        yield "done", cached
+        return
+
+    parser = SubtaskStreamParser()
+    run = AgentRunStats(
+        agent="project_manager_stream", task_id=task_id, user_id=user_id
+    )
+    acquired = False
     try:
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                "http://localhost:11434/api/generate",
-                json={
-                    "model": "gemma3:1b",
-                    "prompt": prompt,
-                    "stream": False,
-                    "format": "json",
-                },
-            )
-            response.raise_for_status()
-            result = response.json()
-            output_text = result.get("response", "{}")
-            return json.loads(output_text)
+        async with agent_scheduler.slot(user_id):
+            acquired = True
+            run.queue_seconds = time.perf_counter() - run.started
+            yield "start", {}
+            async with agent_backends.stream(
+                "/api/generate",
+                {"prompt": prompt, **GENERATION_PARAMS, "stream": True},
+            ) as (backend, response):
+                run.model, run.backend_url = backend.model, backend.url
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    for sub in parser.feed(chunk.get("response", "")):
+                        try:
+                            subtask = AgentSubtask.model_validate(sub)
+                        except ValidationError:
+                            continue
+                        yield "subtask", subtask.model_dump()
+                    if chunk.get("done"):
+                        run.add_ollama_stats(chunk)
+                        break
+        result = parse_split_output(parser.text).model_dump()
     except Exception as e:
-        return {
-            "reasoning_log": [f"Ошибка при вызове LLM: {str(e)}"],
-            "subtasks": [
-                {
-                    "id": 1,
-                    "title": "Ошибка генерации",
-                    "description": "Не удалось разбить задачу. Проверьте, запущен ли Ollama.",
-                }
-            ],
-        }
+        run.fail(e)
+        raise
+    except (asyncio.CancelledError, GeneratorExit):
+        run.status = "cancelled"
+        raise
+    finally:
+        if acquired:
+            await agent_run_recorder.record(run)
+    agent_cache.set(cache_key, result)
+    yield "done", result
@@ -0,0 +1,131 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Hashable
+from contextlib import asynccontextmanager
+
+from app.core.config import settings
+from app.services.metrics import Histogram
+
+
+class AgentOverloadedError(Exception):
+    """Очередь к LLM переполнена."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("LLM backend is overloaded")
+        self.retry_after = retry_after
+
+
+class FairScheduler:
+    """Глобальный лимит одновременных запросов к LLM с честной очередью.
+
+    Освободившийся слот получает пользователь с наименьшим числом своих
+    запросов в работе, при равенстве — тот, кого обслуживали раньше всех.
+    Всплеск запросов одного пользователя не задерживает остальных. Если в
+    очереди max_queue ожидающих, новый запрос сразу получает
+    AgentOverloadedError.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, retry_after: int) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+        self.wait_time = Histogram()
+        self._waiters: dict[Hashable, deque[asyncio.Future]] = {}
+        self._running: dict[Hashable, int] = {}
+        self._served_at: dict[Hashable, int] = {}
+        self._clock = itertools.count(1)
+
+    def _grant(self, user: Hashable) -> None:
+        self._running[user] = self._running.get(user, 0) + 1
+        self._served_at[user] = next(self._clock)
+
+    async def acquire(self, user: Hashable) -> None:
+        """Ожидание слота для пользователя."""
+        if self.in_flight < self.max_in_flight and not self.queued:
+            self.in_flight += 1
+            self._grant(user)
+            self.wait_time.observe(0.0)
+            return
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise AgentOverloadedError(self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(user, deque()).append(waiter)
+        self.queued += 1
+        start = time.perf_counter()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Слот уже передан, но ожидающий отменён — возвращаем слот.
+                self.release(user)
+            else:
+                self._discard(user, waiter)
+            raise
+        self.wait_time.observe(time.perf_counter() - start)
+
+    def _discard(self, user: Hashable, waiter: asyncio.Future) -> None:
+        queue = self._waiters.get(user)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self.queued -= 1
+            if not queue:
+                del self._waiters[user]
+
+    def release(self, user: Hashable) -> None:
+        """Освобождение слота: передача следующему по очереди или в пул."""
+        self._running[user] -= 1
+        while self._waiters:
+            next_user = min(
+                self._waiters,
+                key=lambda u: (self._running.get(u, 0), self._served_at.get(u, 0)),
+            )
+            queue = self._waiters[next_user]
+            waiter = queue.popleft()
+            self.queued -= 1
+            if not queue:
+                del self._waiters[next_user]
+            if not waiter.done():
+                self._grant(next_user)
+                waiter.set_result(None)
+                break
+        else:
+            self.in_flight -= 1
+        if not self._running[user]:
+            del self._running[user]
+            if user not in self._waiters:
+                self._served_at.pop(user, None)
+
+    @asynccontextmanager
+    async def slot(self, user: Hashable) -> AsyncIterator[None]:
+        """Выполнение блока в слоте пользователя."""
+        await self.acquire(user)
+        try:
+            yield
+        finally:
+            self.release(user)
+
+    def stats(self) -> dict:
+        """Загрузка и время ожидания в очереди."""
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "users_waiting": len(self._waiters),
+            "rejected": self.rejected,
+            "wait_seconds": self.wait_time.snapshot(),
+        }
+
+
+agent_scheduler = FairScheduler(
+    max_in_flight=settings.AGENT_MAX_IN_FLIGHT,
+    max_queue=settings.AGENT_MAX_QUEUE,
+    retry_after=settings.AGENT_RETRY_AFTER_SECONDS,
+)
@@ -0,0 +1,91 @@
+import json
+from typing import Any
+
+from app.services.metrics import Histogram
+
+# Время от запроса на потоковую разбивку до первой подзадачи.
+time_to_first_subtask = Histogram()
+
+
+class SubtaskStreamParser:
+    """Инкрементальный разбор ответа агента по мере генерации.
+
+    На вход подаются куски JSON-текста, на выходе — подзадачи из массива
+    "subtasks", как только закрывается объект очередной подзадачи.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = ""
+        self._key: str | None = None
+        self._array_depth: int | None = None
+        self._item_start: int | None = None
+
+    def feed(self, chunk: str) -> list[dict[str, Any]]:
+        """Добавление куска текста; возвращает подзадачи, завершённые в нём."""
+        self.text += chunk
+        items = []
+        text = self.text
+        while self._pos < len(text):
+            char = text[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start : self._pos + 1]
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif char == ":" and self._depth == 1:
+                self._key = self._parse_key(self._last_string)
+            elif char in "{[":
+                if char == "[" and self._depth == 1 and self._key == "subtasks":
+                    self._array_depth = self._depth + 1
+                elif char == "{" and self._depth == self._array_depth:
+                    self._item_start = self._pos
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._item_start is not None and self._depth == self._array_depth:
+                    item = self._parse_item(text[self._item_start : self._pos + 1])
+                    if item is not None:
+                        items.append(item)
+                    self._item_start = None
+                elif char == "]" and self._depth + 1 == self._array_depth:
+                    self._array_depth = None
+            self._pos += 1
+        return items
+
+    @staticmethod
+    def _parse_key(raw: str) -> str | None:
+        # Модель может выдать ключ с неверным экранированием ("a\q") —
+        # такой ключ просто не совпадёт с "subtasks", разбор продолжается.
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+
+    @staticmethod
+    def _parse_item(raw: str) -> dict[str, Any] | None:
+        try:
+            item = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(item, dict) or "title" not in item:
+            return None
+        return item
+
+    def result(self) -> dict[str, Any] | None:
+        """Полный ответ, если текст сложился в корректный JSON."""
+        try:
+            return json.loads(self.text)
+        except json.JSONDecodeError:
+            return None
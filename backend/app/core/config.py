@@ -1,11 +1,70 @@
+from typing import Literal
+
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
 
+class OllamaBackend(BaseModel):
+    """Сервер Ollama и модель на нём."""
+
+    url: str
+    model: str = "gemma3:1b"
+
+
 class Settings(BaseSettings):
     DATABASE_URL: str
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Создание таблиц при старте; в продакшене схему ведёт alembic.
+    DB_AUTO_CREATE: bool = True
+    USER_CACHE_MAXSIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    JWT_CLAIMS_CACHE_MAXSIZE: int = 10_000
+    JWT_CLAIMS_CACHE_TTL_SECONDS: float = 300.0
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    TASK_TREE_MAX_DEPTH: int = 50
+    TASK_BULK_MAX_ITEMS: int = 1000
+    AGENT_CACHE_BACKEND: Literal["memory", "sqlite"] = "memory"
+    AGENT_CACHE_PATH: str = "agent_cache.db"
+    AGENT_CACHE_MAXSIZE: int = 1000
+    AGENT_CACHE_TTL_SECONDS: float = 24 * 60 * 60
+    OLLAMA_BASE_URL: str = "http://localhost:11434"
+    OLLAMA_MODEL: str = "gemma3:1b"
+    # JSON-список {"url": ..., "model": ...}; пустой — один OLLAMA_BASE_URL.
+    OLLAMA_BACKENDS: list[OllamaBackend] = []
+    AGENT_BACKEND_FAILURE_THRESHOLD: int = 3
+    AGENT_BACKEND_COOLDOWN_SECONDS: float = 30.0
+    AGENT_HEALTH_CHECK_INTERVAL: float = 15.0
+    AGENT_HTTP_MAX_CONNECTIONS: int = 20
+    AGENT_HTTP_MAX_KEEPALIVE: int = 10
+    AGENT_HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    AGENT_HTTP_CONNECT_TIMEOUT: float = 5.0
+    AGENT_HTTP_READ_TIMEOUT: float = 120.0
+    AGENT_MAX_ATTEMPTS: int = 2
+    AGENT_MAX_IN_FLIGHT: int = 2
+    AGENT_MAX_QUEUE: int = 32
+    AGENT_RETRY_AFTER_SECONDS: int = 5
+    SPLIT_BATCH_MAX_TASKS: int = 50
+    SPLIT_BATCH_CONCURRENCY: int = 4
+    SPLIT_JOB_WORKERS: int = 2
+    SPLIT_JOB_POLL_INTERVAL: float = 1.0
+    SPLIT_JOB_STALE_SECONDS: float = 600.0
+    MAINTENANCE_INTERVAL_SECONDS: float = 3600.0
+    MAINTENANCE_BATCH_SIZE: int = 500
+    EXPIRED_TOKEN_RETENTION_HOURS: float = 0.0
+    UNCONFIRMED_USER_RETENTION_HOURS: float = 72.0
+    SQL_QUERY_COUNT_HEADER: bool = False
+    SQL_PROFILER_ENABLED: bool = False
+    SQL_SLOW_QUERY_MS: float = 200.0
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    HTTP_METRICS_ENABLED: bool = True
 
     class Config:
         env_file = ".env"
@@ -15,6 +74,7 @@ class TestSettings(Settings):
     DATABASE_URL: str = "sqlite:///./test.db"
     SECRET_KEY: str = "test-secret-key-for-tests-only"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    SQL_QUERY_COUNT_HEADER: bool = True
 
     class Config:
         env_file = None
@@ -1,31 +1,94 @@
+import functools
+import hashlib
 import secrets
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Callable, Optional
 
+from fastapi import HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
-from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.services.cache import TTLCache
+from app.services.hashing import BoundedExecutor, ExecutorSaturatedError
 
 ALGORITHM = "HS256"
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+password_hasher = BoundedExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    name="password-hash",
+)
+# Проверенные claims по token_digest; ключ подписи, под которым они проверены,
+# хранится рядом, чтобы смена SECRET_KEY сбрасывала кэш целиком.
+jwt_claims_cache = TTLCache(
+    maxsize=settings.JWT_CLAIMS_CACHE_MAXSIZE,
+    ttl=settings.JWT_CLAIMS_CACHE_TTL_SECONDS,
+)
+_claims_secret_key = settings.SECRET_KEY
+
+
+@functools.cache
+def pwd_context():
+    """Контекст passlib; passlib и argon2 загружаются при первом хешировании."""
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["argon2"], deprecated="auto")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Верификация пароля."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Получение хеша пароля."""
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
+
+
+async def _run_hashing(fn: Callable[..., Any], *args: Any) -> Any:
+    try:
+        return await password_hasher.run(fn, *args)
+    except ExecutorSaturatedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many password operations, try again later",
+            headers={"Retry-After": "1"},
+        ) from e
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Верификация пароля в пуле хеширования, не блокируя event loop."""
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Получение хеша пароля в пуле хеширования, не блокируя event loop."""
+    return await _run_hashing(get_password_hash, password)
 
 
 def decode_jwt(token: str) -> dict:
-    """Декодирование JWT-токена."""
-    return jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    """Декодирование JWT-токена.
+
+    Проверенные claims кэшируются по SHA-256 токена не дольше, чем до его exp,
+    так что повторный запрос с тем же токеном не проверяет подпись заново.
+    """
+    global _claims_secret_key
+    secret_key = settings.SECRET_KEY
+    if secret_key != _claims_secret_key:
+        jwt_claims_cache.clear()
+        _claims_secret_key = secret_key
+    key = token_digest(token)
+    claims = jwt_claims_cache.get(key)
+    if claims is None:
+        claims = jwt.decode(token, secret_key, algorithms=[ALGORITHM])
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            ttl = min(exp - time.time(), jwt_claims_cache.ttl)
+            if ttl > 0:
+                jwt_claims_cache.set(key, claims, ttl=ttl)
+    return dict(claims)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -40,10 +103,17 @@ def create_refresh_token(data: dict, expires_delta: timedelta) -> str:
     """Создание refresh-токена."""
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + expires_delta
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update(
+        {"exp": expire, "type": "refresh", "jti": secrets.token_urlsafe(8)}
+    )
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
 
 
+def token_digest(token: str) -> str:
+    """SHA-256 токена в hex: так refresh-токены хранятся и ищутся в БД."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def generate_confirmation_token() -> str:
     """Генерация токена подтверждения."""
     return secrets.token_urlsafe(32)
@@ -1,9 +1,11 @@
+from datetime import datetime, timezone
+
 from fastapi import HTTPException, Request, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import decode_jwt
-from app.crud.token import get_refresh_token
-from app.crud.user import get_user_by_id
+from app.crud.token import get_refresh_token_async
+from app.crud.user import get_user_by_id_async
 from app.models.user import User
 from app.schemas.token import TokenData
 
@@ -20,7 +22,7 @@ def get_token_from_request(request: Request) -> str:
     return auth_header[7:]
 
 
-def verify_refresh_token(token: str, db: Session) -> User:
+async def verify_refresh_token(token: str, db: AsyncSession) -> User:
     """Проверяет refresh-токен и возвращает пользователя."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -34,20 +36,22 @@ def verify_refresh_token(token: str, db: Session) -> User:
         if user_id is None or token_type != "refresh":
             raise credentials_exception
 
-        db_token = get_refresh_token(db, token)
+        db_token = await get_refresh_token_async(db, token)
         if db_token is None:
             raise credentials_exception
 
-        from datetime import datetime, timezone
-
-        if db_token.expires_at < datetime.now(timezone.utc):
+        expires_at = db_token.expires_at
+        if expires_at.tzinfo is None:
+            # SQLite возвращает время без часового пояса; храним его в UTC.
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at < datetime.now(timezone.utc):
             raise credentials_exception
 
         token_data = TokenData(user_id=int(user_id))
     except Exception as e:
         raise credentials_exception from e
 
-    user = get_user_by_id(db, user_id=token_data.user_id)
+    user = await get_user_by_id_async(db, user_id=token_data.user_id)
     if user is None:
         raise credentials_exception
     return user
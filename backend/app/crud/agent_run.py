@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.agent_run import AgentRun
+
+
+async def create_agent_run_async(db: AsyncSession, **fields) -> None:
+    """Запись вызова агента."""
+    db.add(AgentRun(**fields))
+    await db.commit()
+
+
+async def get_agent_runs_since_async(
+    db: AsyncSession, since: datetime, limit: int
+) -> list[AgentRun]:
+    """Последние вызовы агентов начиная с since (не больше limit)."""
+    result = await db.scalars(
+        select(AgentRun)
+        .where(AgentRun.created_at >= since)
+        .order_by(AgentRun.created_at.desc())
+        .limit(limit)
+    )
+    return list(result)
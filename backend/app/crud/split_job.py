@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.split_job import SplitJob
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+async def create_split_job_async(
+    db: AsyncSession, task_id: int, user_id: int
+) -> SplitJob:
+    """Постановка разбивки задачи в очередь."""
+    job = SplitJob(task_id=task_id, user_id=user_id, status=QUEUED)
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def get_user_split_job_async(
+    db: AsyncSession, job_id: int, user_id: int
+) -> SplitJob | None:
+    """Задание пользователя по id."""
+    return await db.scalar(
+        select(SplitJob).where(SplitJob.id == job_id, SplitJob.user_id == user_id)
+    )
+
+
+async def claim_split_job_async(db: AsyncSession) -> SplitJob | None:
+    """Захват самого старого задания из очереди.
+
+    Условие на статус в UPDATE не даёт двум воркерам (в том числе из разных
+    процессов) взять одно задание.
+    """
+    oldest = (
+        select(SplitJob.id)
+        .where(SplitJob.status == QUEUED)
+        .order_by(SplitJob.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    job = await db.scalar(
+        update(SplitJob)
+        .where(SplitJob.id == oldest, SplitJob.status == QUEUED)
+        .values(status=RUNNING, started_at=datetime.now(timezone.utc))
+        .returning(SplitJob)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return job
+
+
+async def finish_split_job_async(
+    db: AsyncSession,
+    job_id: int,
+    result: dict[str, Any] | None = None,
+    error: str | None = None,
+) -> None:
+    """Завершение задания с результатом или ошибкой."""
+    await db.execute(
+        update(SplitJob)
+        .where(SplitJob.id == job_id)
+        .values(
+            status=FAILED if error is not None else DONE,
+            result=result,
+            error=error,
+            finished_at=datetime.now(timezone.utc),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def requeue_stale_split_jobs_async(db: AsyncSession, stale_after: float) -> int:
+    """Возврат в очередь заданий, зависших в running (например, после падения)."""
+    deadline = datetime.now(timezone.utc) - timedelta(seconds=stale_after)
+    result = await db.execute(
+        update(SplitJob)
+        .where(SplitJob.status == RUNNING, SplitJob.started_at < deadline)
+        .values(status=QUEUED, started_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def requeue_split_jobs_async(db: AsyncSession, job_ids: set[int]) -> None:
+    """Возврат в очередь прерванных заданий."""
+    await db.execute(
+        update(SplitJob)
+        .where(SplitJob.id.in_(job_ids), SplitJob.status == RUNNING)
+        .values(status=QUEUED, started_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
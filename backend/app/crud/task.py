@@ -1,10 +1,26 @@
-from sqlalchemy.orm import Session
+import re
 
-from app.models.task import Task
-from app.schemas.task import TaskCreate, TaskUpdate
+from sqlalchemy import (
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    table,
+    union_all,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from app.models import search
+from app.models.task import Subtask, Task
+from app.schemas.task import TaskBulkUpdateItem, TaskCreate, TaskUpdate
 
-def create_task(db: Session, task: TaskCreate, user_id: int) -> Task:
+
+async def create_task_async(db: AsyncSession, task: TaskCreate, user_id: int) -> Task:
     """Создание задачи."""
     db_task = Task(
         title=task.title,
@@ -14,42 +30,259 @@ def create_task(db: Session, task: TaskCreate, user_id: int) -> Task:
         user_id=user_id,
     )
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    await db.commit()
+    await db.refresh(db_task)
     return db_task
 
 
-def get_task_by_id(db: Session, task_id: int) -> Task:
+async def get_task_by_id_async(db: AsyncSession, task_id: int) -> Task | None:
     """Получение задачи по ID."""
-    return db.query(Task).filter(Task.id == task_id).first()
+    return await db.scalar(select(Task).where(Task.id == task_id))
 
 
-def get_tasks_by_user(
-    db: Session, user_id: int, skip: int = 0, limit: int = 10
+async def get_tasks_by_user_async(
+    db: AsyncSession,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 10,
+    after_id: int | None = None,
 ) -> list[Task]:
-    """Получение задач пользователя."""
-    return (
-        db.query(Task).filter(Task.user_id == user_id).offset(skip).limit(limit).all()
-    )
+    """Получение задач пользователя по возрастанию id.
+
+    after_id включает keyset-пагинацию: страница начинается сразу после
+    задачи с этим id, и глубина страницы не влияет на стоимость запроса.
+    """
+    query = select(Task).where(Task.user_id == user_id)
+    if after_id is not None:
+        query = query.where(Task.id > after_id)
+    result = await db.scalars(query.order_by(Task.id).offset(skip).limit(limit))
+    return list(result)
 
 
-def update_task(db: Session, task_id: int, task_update: TaskUpdate) -> Task | None:
-    """Обновление задачи."""
-    db_task = get_task_by_id(db, task_id)
-    if not db_task:
-        return None
-    for field, value in task_update.model_dump(exclude_unset=True).items():
-        setattr(db_task, field, value)
-    db.commit()
-    db.refresh(db_task)
+async def update_user_task_async(
+    db: AsyncSession, task_id: int, user_id: int, task_update: TaskUpdate
+) -> Task | None:
+    """Обновление задачи владельца одним запросом UPDATE ... RETURNING.
+
+    Возвращает None, если задачи нет или она принадлежит другому пользователю.
+    """
+    values = task_update.model_dump(exclude_unset=True)
+    owned = (Task.id == task_id, Task.user_id == user_id)
+    if not values:
+        return await db.scalar(select(Task).where(*owned))
+    db_task = await db.scalar(
+        update(Task)
+        .where(*owned)
+        .values(**values)
+        .returning(Task)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
     return db_task
 
 
-def delete_task(db: Session, task_id: int) -> bool:
-    """Удаление задачи."""
-    db_task = get_task_by_id(db, task_id)
-    if not db_task:
-        return False
-    db.delete(db_task)
-    db.commit()
-    return True
+async def delete_user_task_async(db: AsyncSession, task_id: int, user_id: int) -> bool:
+    """Удаление задачи владельца одним запросом DELETE.
+
+    Подзадачи удаляет, а дочерние задачи отвязывает сама БД (ON DELETE).
+    """
+    result = await db.execute(
+        delete(Task)
+        .where(Task.id == task_id, Task.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount > 0
+
+
+async def get_owned_task_ids_async(
+    db: AsyncSession, task_ids: list[int], user_id: int
+) -> set[int]:
+    """Какие из task_ids принадлежат пользователю."""
+    if not task_ids:
+        return set()
+    result = await db.scalars(
+        select(Task.id).where(Task.id.in_(set(task_ids)), Task.user_id == user_id)
+    )
+    return set(result)
+
+
+async def create_tasks_bulk_async(
+    db: AsyncSession, tasks: list[TaskCreate], user_id: int
+) -> list[Task]:
+    """Создание пачки задач многострочным INSERT ... RETURNING.
+
+    Строки RETURNING идут в порядке запроса. Postgres укладывает пакет в один
+    INSERT; SQLite не гарантирует порядок RETURNING, и SQLAlchemy вставляет
+    там по строке.
+    """
+    if not tasks:
+        return []
+    db_tasks = await db.scalars(
+        insert(Task).returning(Task, sort_by_parameter_order=True),
+        [{**task.model_dump(), "user_id": user_id} for task in tasks],
+    )
+    db_tasks = list(db_tasks)
+    await db.commit()
+    return db_tasks
+
+
+async def update_tasks_bulk_async(
+    db: AsyncSession, items: list[TaskBulkUpdateItem], user_id: int
+) -> dict[int, Task]:
+    """Обновление пачки задач пользователя в одной транзакции.
+
+    Чужие и несуществующие задачи пропускаются. Изменения уходят одним
+    executemany по первичному ключу.
+    """
+    owned = await get_owned_task_ids_async(db, [item.id for item in items], user_id)
+    rows = [item.model_dump(exclude_unset=True) for item in items if item.id in owned]
+    rows = [row for row in rows if len(row) > 1]
+    if rows:
+        await db.execute(update(Task), rows)
+    updated = await db.scalars(
+        select(Task).where(Task.id.in_(owned)).execution_options(populate_existing=True)
+    )
+    updated = {task.id: task for task in updated}
+    await db.commit()
+    return updated
+
+
+async def delete_tasks_bulk_async(
+    db: AsyncSession, task_ids: list[int], user_id: int
+) -> set[int]:
+    """Удаление пачки задач пользователя одним DELETE ... RETURNING."""
+    if not task_ids:
+        return set()
+    result = await db.scalars(
+        delete(Task)
+        .where(Task.id.in_(set(task_ids)), Task.user_id == user_id)
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = set(result)
+    await db.commit()
+    return deleted
+
+
+async def create_subtasks_bulk_async(
+    db: AsyncSession, subtasks: list[dict]
+) -> list[Subtask]:
+    """Создание подзадач многострочным INSERT ... RETURNING в порядке запроса."""
+    if not subtasks:
+        return []
+    db_subtasks = await db.scalars(
+        insert(Subtask).returning(Subtask, sort_by_parameter_order=True), subtasks
+    )
+    db_subtasks = list(db_subtasks)
+    await db.commit()
+    return db_subtasks
+
+
+async def get_task_tree_async(
+    db: AsyncSession, task_id: int, user_id: int, max_depth: int
+) -> tuple[list[Task], list[Subtask]]:
+    """Задача со всеми потомками до max_depth и их подзадачи.
+
+    Иерархия выбирается одним рекурсивным CTE, подзадачи — вторым запросом,
+    поэтому число запросов не зависит от размера дерева. Задачи отдаются
+    в порядке обхода в ширину, первой идёт корневая.
+    """
+    tree = (
+        select(Task.id, literal(0).label("depth"))
+        .where(Task.id == task_id, Task.user_id == user_id)
+        .cte("task_tree", recursive=True)
+    )
+    child = aliased(Task)
+    tree = tree.union_all(
+        select(child.id, tree.c.depth + 1)
+        .join(tree, child.parent_task_id == tree.c.id)
+        .where(child.user_id == user_id, tree.c.depth < max_depth)
+    )
+    tasks = list(
+        await db.scalars(
+            select(Task)
+            .join(tree, Task.id == tree.c.id)
+            .order_by(tree.c.depth, Task.id)
+        )
+    )
+    if not tasks:
+        return [], []
+    subtasks = await db.scalars(
+        select(Subtask)
+        .where(Subtask.task_id.in_([task.id for task in tasks]))
+        .order_by(Subtask.id)
+    )
+    return tasks, list(subtasks)
+
+
+_SEARCH_TERM = re.compile(r"[^\W_]+")
+
+
+def _fts5_matches(terms: list[str]):
+    """(task_id, score) совпадений в таблицах FTS5; bm25 меньше — лучше."""
+    match = " ".join(f'"{term}"' for term in terms) + "*"
+    tasks_fts = table(search.fts_table("tasks"), column("rowid"))
+    subtasks_fts = table(search.fts_table("subtasks"), column("rowid"))
+    tasks_ref = literal_column(tasks_fts.name)
+    subtasks_ref = literal_column(subtasks_fts.name)
+    return union_all(
+        select(
+            tasks_fts.c.rowid.label("task_id"),
+            (-func.bm25(tasks_ref)).label("score"),
+        ).where(tasks_ref.op("MATCH")(match)),
+        select(Subtask.task_id, -func.bm25(subtasks_ref))
+        .select_from(subtasks_fts)
+        .join(Subtask, Subtask.id == subtasks_fts.c.rowid)
+        .where(subtasks_ref.op("MATCH")(match)),
+    )
+
+
+def _tsvector_matches(terms: list[str]):
+    """(task_id, score) совпадений по GIN-индексам to_tsvector."""
+    config = literal_column(f"'{search.TS_CONFIG}'::regconfig")
+    query = func.to_tsquery(config, " & ".join(terms) + ":*")
+    tasks_vector = literal_column(search.ts_vector("tasks"))
+    subtasks_vector = literal_column(search.ts_vector("subtasks"))
+    return union_all(
+        select(
+            Task.id.label("task_id"),
+            func.ts_rank(tasks_vector, query).label("score"),
+        ).where(tasks_vector.op("@@")(query)),
+        select(Subtask.task_id, func.ts_rank(subtasks_vector, query)).where(
+            subtasks_vector.op("@@")(query)
+        ),
+    )
+
+
+async def search_tasks_async(
+    db: AsyncSession, user_id: int, query: str, limit: int = 20
+) -> list[tuple[Task, float]]:
+    """Полнотекстовый поиск по задачам пользователя и их подзадачам.
+
+    Нужны все слова запроса, последнее ищется как префикс (поиск по мере
+    ввода). Задача получает лучший балл среди себя и своих подзадач.
+    Совпадения группируются до соединения с tasks: задачи владельца
+    читаются по первичному ключу, а не перебором всех его задач.
+    """
+    terms = _SEARCH_TERM.findall(query.lower())
+    if not terms:
+        return []
+    if db.get_bind().dialect.name == "postgresql":
+        matches = _tsvector_matches(terms).subquery("matches")
+    else:
+        matches = _fts5_matches(terms).subquery("matches")
+    ranked = (
+        select(matches.c.task_id, func.max(matches.c.score).label("score"))
+        .group_by(matches.c.task_id)
+        .subquery("ranked")
+    )
+    rows = await db.execute(
+        select(Task, ranked.c.score)
+        .select_from(ranked)
+        .join(Task, Task.id == ranked.c.task_id)
+        .where(Task.user_id == user_id)
+        .order_by(ranked.c.score.desc(), Task.id)
+        .limit(limit)
+    )
+    return [(task, score) for task, score in rows]
@@ -1,29 +1,51 @@
 from datetime import datetime
 
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.security import token_digest
 from app.models.token import RefreshToken
 
 
-def create_refresh_token(
-    db: Session, user_id: int, token: str, expires_at: datetime
+async def create_refresh_token_async(
+    db: AsyncSession, user_id: int, token: str, expires_at: datetime
 ) -> RefreshToken:
     """Создание refresh-токена."""
-    db_token = RefreshToken(user_id=user_id, token=token, expires_at=expires_at)
+    db_token = RefreshToken(
+        user_id=user_id, token_hash=token_digest(token), expires_at=expires_at
+    )
     db.add(db_token)
-    db.commit()
-    db.refresh(db_token)
+    await db.commit()
+    await db.refresh(db_token)
     return db_token
 
 
-def get_refresh_token(db: Session, token: str) -> RefreshToken:
+async def get_refresh_token_async(db: AsyncSession, token: str) -> RefreshToken:
     """Получение refresh-токена из базы данных."""
-    return db.query(RefreshToken).filter(RefreshToken.token == token).first()
+    return await db.scalar(
+        select(RefreshToken).where(RefreshToken.token_hash == token_digest(token))
+    )
 
 
-def delete_refresh_token(db: Session, token: str) -> None:
+async def delete_refresh_token_async(db: AsyncSession, token: str) -> None:
     """Удаляет токен из базы данных."""
-    db_token = get_refresh_token(db, token)
-    if db_token:
-        db.delete(db_token)
-        db.commit()
+    await db.execute(
+        delete(RefreshToken).where(RefreshToken.token_hash == token_digest(token))
+    )
+    await db.commit()
+
+
+async def delete_expired_refresh_tokens_async(
+    db: AsyncSession, expired_before: datetime, limit: int
+) -> int:
+    """Удаление не больше limit токенов, истёкших до expired_before."""
+    ids = (
+        select(RefreshToken.id)
+        .where(RefreshToken.expires_at < expired_before)
+        .order_by(RefreshToken.id)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    result = await db.execute(delete(RefreshToken).where(RefreshToken.id.in_(ids)))
+    await db.commit()
+    return result.rowcount
@@ -1,90 +1,135 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, exists, select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import (
-    generate_confirmation_token,
-    get_password_hash,
-    verify_password,
-)
+from app.core.security import generate_confirmation_token, get_password_hash_async
+from app.models.task import Task
 from app.models.token import RefreshToken
 from app.models.user import User
 from app.schemas import UserCreate, UserUpdate
+from app.services.user_cache import invalidate_user
 
 
-def create_user(db: Session, user: UserCreate) -> User:
+async def create_user_async(
+    db: AsyncSession, user: UserCreate, hashed_password: str | None = None
+) -> User:
     """Создание пользователя."""
-    hashed_password = get_password_hash(user.password)
-    confirmation_token = generate_confirmation_token()
+    if hashed_password is None:
+        hashed_password = await get_password_hash_async(user.password)
     db_user = User(
         email=user.email,
         hashed_password=hashed_password,
         is_active=False,
-        confirmation_token=confirmation_token,
+        confirmation_token=generate_confirmation_token(),
     )
     db.add(db_user)
     try:
-        db.commit()
-        db.refresh(db_user)
-        return db_user
+        await db.commit()
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         raise ValueError("Email already registered") from e
+    await db.refresh(db_user)
+    return db_user
 
 
-def get_user_by_email(db: Session, email: str) -> User | None:
+async def get_user_by_email_async(db: AsyncSession, email: str) -> User | None:
     """Получение пользователя по email."""
-    return db.query(User).filter(User.email == email).first()
-
+    return await db.scalar(select(User).where(User.email == email))
 
-def authenticate_user(db: Session, email: str, password: str) -> User | None:
-    """Аутентификация."""
-    user = get_user_by_email(db, email=email)
-    if not user:
-        return None
-    if not verify_password(password, user.hashed_password):
-        return None
-    return user
 
-
-def get_user_by_id(db: Session, user_id: int) -> User | None:
+async def get_user_by_id_async(db: AsyncSession, user_id: int) -> User | None:
     """Получение пользователя по id."""
-    user = db.query(User).filter(User.id == user_id).first()
-    return user
+    return await db.scalar(select(User).where(User.id == user_id))
 
 
-def update_user(db: Session, user_id: int, user_update: UserUpdate) -> User:
+async def update_user_async(
+    db: AsyncSession,
+    user_id: int,
+    user_update: UserUpdate,
+    hashed_password: str | None = None,
+) -> User:
     """Обновление пользователя."""
-    db_user = get_user_by_id(db, user_id=user_id)
+    db_user = await get_user_by_id_async(db, user_id=user_id)
     if not db_user:
         raise ValueError("User not found")
     if user_update.email and user_update.email != db_user.email:
-        exsiting = get_user_by_email(db, email=user_update.email)
+        exsiting = await get_user_by_email_async(db, email=user_update.email)
         if exsiting:
             raise ValueError("Email already registred")
         db_user.email = user_update.email
     if user_update.password:
-        db_user.hashed_password = get_password_hash(user_update.password)
-    db.commit()
-    db.refresh(db_user)
+        db_user.hashed_password = hashed_password or await get_password_hash_async(
+            user_update.password
+        )
+    await db.commit()
+    await db.refresh(db_user)
+    invalidate_user(user_id)
     return db_user
 
 
-def get_all_users(db: Session, skip: int = 0, limit: int = 100) -> list[User]:
-    """Получение всех пользователей."""
-    return db.query(User).offset(skip).limit(limit).all()
+async def get_all_users_async(
+    db: AsyncSession, skip: int = 0, limit: int = 100, after_id: int | None = None
+) -> list[User]:
+    """Получение всех пользователей по возрастанию id, после after_id."""
+    query = select(User)
+    if after_id is not None:
+        query = query.where(User.id > after_id)
+    result = await db.scalars(query.order_by(User.id).offset(skip).limit(limit))
+    return list(result)
 
 
-def delete_user(db: Session, user_id: int) -> bool:
+async def delete_user_async(db: AsyncSession, user_id: int) -> bool:
     """Удаление пользователя по id."""
-    user = get_user_by_id(db, user_id)
-    if not user:
-        return False
-    db.query(RefreshToken).filter(RefreshToken.user_id == user_id).delete()
-    db.delete(user)
-    db.commit()
-    return True
+    await db.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id))
+    result = await db.execute(delete(User).where(User.id == user_id))
+    await db.commit()
+    invalidate_user(user_id)
+    return result.rowcount > 0
 
 
-def get_user_by_confirmation_token(db: Session, token: str) -> User | None:
+async def get_user_by_confirmation_token_async(
+    db: AsyncSession, token: str
+) -> User | None:
     """Получение пользователя по токену подтверждения."""
-    return db.query(User).filter(User.confirmation_token == token).first()
+    return await db.scalar(select(User).where(User.confirmation_token == token))
+
+
+async def delete_unconfirmed_users_async(
+    db: AsyncSession, created_before: datetime, limit: int
+) -> int:
+    """Удаление не больше limit неподтверждённых пользователей без задач.
+
+    Учитываются только зарегистрированные до created_before и без действующего
+    refresh-токена (пользователь с живой сессией аккаунтом пользуется).
+    Токены удалённых пользователей снимает ON DELETE CASCADE.
+    """
+    stale = (
+        select(User.id)
+        .where(
+            User.is_active.is_(False),
+            User.confirmation_token.is_not(None),
+            User.created_at < created_before,
+            ~exists().where(Task.user_id == User.id),
+            ~exists().where(
+                RefreshToken.user_id == User.id,
+                RefreshToken.expires_at > datetime.now(timezone.utc),
+            ),
+        )
+        .order_by(User.id)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    removed = list(
+        await db.scalars(
+            delete(User)
+            .where(User.id.in_(stale))
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+    )
+    await db.commit()
+    for user_id in removed:
+        invalidate_user(user_id)
+    return len(removed)
@@ -1,12 +1,59 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.services import http_metrics, sql_profiler
+from app.services.db_pool import pool_options
 
-engine = create_engine(settings.DATABASE_URL)
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def make_async_url(url: str) -> str:
+    """Перевод URL базы данных на асинхронный драйвер."""
+    db_url = make_url(url)
+    backend = db_url.get_backend_name()
+    if backend not in ASYNC_DRIVERS or db_url.get_driver_name() in (
+        ASYNC_DRIVERS.values()
+    ):
+        return db_url.render_as_string(hide_password=False)
+    return db_url.set(
+        drivername=f"{backend}+{ASYNC_DRIVERS[backend]}"
+    ).render_as_string(hide_password=False)
+
+
+def _enable_foreign_keys(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def configure_engine(engine: Engine) -> None:
+    """Общая настройка движка: профилировщик и время SQL, внешние ключи в SQLite.
+
+    Без PRAGMA foreign_keys SQLite не выполняет ON DELETE CASCADE.
+    """
+    sql_profiler.install(engine)
+    http_metrics.install(engine)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _enable_foreign_keys)
+
+
+engine = create_engine(settings.DATABASE_URL, **pool_options(settings.DATABASE_URL))
+async_engine = create_async_engine(
+    make_async_url(settings.DATABASE_URL),
+    **pool_options(settings.DATABASE_URL, async_engine=True),
+)
+
+configure_engine(engine)
+configure_engine(async_engine.sync_engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
 Base = declarative_base()
 
 
@@ -17,3 +64,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Генератор асинхронных сессий."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,20 +1,54 @@
-from pydoc import text
+from contextlib import asynccontextmanager
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 # from fastapi.responses import FileResponse
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.database import Base, engine, get_db
-from app.routers import ai, auth, email, tasks, users
+from app.agents.backends import agent_backends
+from app.agents.http import agent_http
+from app.agents.scheduler import AgentOverloadedError
+from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.database import Base, async_engine, engine, get_db
+from app.routers import ai, auth, email, jobs, metrics, tasks, users
+from app.services.http_metrics import MetricsMiddleware
+from app.services.maintenance import maintenance_sweeper
+from app.services.split_jobs import split_workers
+from app.services.sql_profiler import SQLProfilerMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Создание схемы и запуск фоновых задач, закрытие пулов при остановке.
+
+    В продакшене схемой управляет alembic (DB_AUTO_CREATE=false), и create_all
+    на старте не выполняется. HTTP-клиент агентов открывается при первом
+    запросе к LLM.
+    """
+    if settings.DB_AUTO_CREATE:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    await agent_backends.start(settings.AGENT_HEALTH_CHECK_INTERVAL)
+    await split_workers.start(settings.SPLIT_JOB_WORKERS)
+    await maintenance_sweeper.start(settings.MAINTENANCE_INTERVAL_SECONDS)
+    yield
+    await maintenance_sweeper.stop()
+    await split_workers.stop()
+    await agent_backends.stop()
+    await agent_http.aclose()
+    await async_engine.dispose()
+    engine.dispose()
 
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Dev Team AI",
     version="1.0.0",
     description="Многоагентная система для разработчиков",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -26,13 +60,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+
+@app.exception_handler(AgentOverloadedError)
+async def agent_overloaded_handler(request: Request, exc: AgentOverloadedError):
+    """Переполненная очередь к LLM: клиенту — повторить позже."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many AI requests, try again later"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+if settings.SQL_PROFILER_ENABLED or settings.SQL_QUERY_COUNT_HEADER:
+    app.add_middleware(SQLProfilerMiddleware)
+if settings.HTTP_METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(users.router, prefix="/users", tags=["users"])
 app.include_router(email.router, prefix="/email", tags=["email"])
 app.include_router(tasks.router, prefix="/tasks", tags=["task"])
 app.include_router(ai.router, prefix="/ai", tags=["ai"])
+app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 
 
 @app.get("/db-test")
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class AgentRun(Base):
+    """Один вызов LLM-агента: время и расход токенов."""
+
+    __tablename__ = "agent_runs"
+    id = Column(Integer, primary_key=True)
+    task_id = Column(
+        Integer, ForeignKey("tasks.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    agent = Column(String, nullable=False)
+    model = Column(String, nullable=True)
+    backend_url = Column(String, nullable=True)
+    status = Column(String, nullable=False)
+    error = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    queue_seconds = Column(Float, nullable=False, default=0.0)
+    total_seconds = Column(Float, nullable=False, default=0.0)
+    load_seconds = Column(Float, nullable=False, default=0.0)
+    prompt_eval_count = Column(Integer, nullable=False, default=0)
+    prompt_eval_seconds = Column(Float, nullable=False, default=0.0)
+    eval_count = Column(Integer, nullable=False, default=0)
+    eval_seconds = Column(Float, nullable=False, default=0.0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -0,0 +1,71 @@
+"""Полнотекстовый индекс по title/description задач и подзадач.
+
+SQLite: внешняя таблица FTS5 ``<table>_fts`` на каждую таблицу, триггеры
+обновляют её при каждой записи. Postgres: GIN-индекс по выражению
+``to_tsvector``, его поддерживает сама база. Объекты создаются вместе с
+таблицами (create_all) и миграцией 0008; моделей у них нет.
+"""
+
+from sqlalchemy import DDL, Table, event
+
+TS_CONFIG = "simple"
+
+
+def fts_table(table: str) -> str:
+    return f"{table}_fts"
+
+
+def gin_index(table: str) -> str:
+    return f"ix_{table}_search"
+
+
+def ts_vector(table: str) -> str:
+    """Выражение tsvector; запросы должны совпадать с ним, чтобы взять индекс."""
+    return (
+        f"to_tsvector('{TS_CONFIG}', coalesce({table}.title, '') || ' ' || "
+        f"coalesce({table}.description, ''))"
+    )
+
+
+def sqlite_ddl(table: str) -> list[str]:
+    fts = fts_table(table)
+    new = f"INSERT INTO {fts}(rowid, title, description) "
+    new += "VALUES (new.id, new.title, new.description);"
+    old = f"INSERT INTO {fts}({fts}, rowid, title, description) "
+    old += "VALUES ('delete', old.id, old.title, old.description);"
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"title, description, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {new} END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {old} END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF title, description ON {table} "
+        f"BEGIN {old} {new} END",
+    ]
+
+
+def postgresql_ddl(table: str) -> list[str]:
+    return [
+        f"CREATE INDEX {gin_index(table)} ON {table} USING gin ({ts_vector(table)})"
+    ]
+
+
+def is_search_object(name: str | None) -> bool:
+    """Объекты индекса, которых нет в метаданных (для автогенерации Alembic)."""
+    return bool(name) and (name.endswith("_search") or "_fts" in name)
+
+
+def attach(table: Table) -> None:
+    """Создание и удаление индекса вместе с таблицей."""
+    for statement in sqlite_ddl(table.name):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in postgresql_ddl(table.name):
+        event.listen(
+            table, "after_create", DDL(statement).execute_if(dialect="postgresql")
+        )
+    event.listen(
+        table,
+        "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {fts_table(table.name)}").execute_if(
+            dialect="sqlite"
+        ),
+    )
@@ -1,25 +1,34 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.database import Base
+from app.models import search
 
 
 class Task(Base):
     """Задача."""
 
     __tablename__ = "tasks"
+    __table_args__ = (Index("ix_tasks_user_id_id", "user_id", "id"),)
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     description = Column(String, nullable=True)
     status = Column(String, default="pending")
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    parent_task_id = Column(Integer, ForeignKey("tasks.id"), nullable=True)
+    parent_task_id = Column(
+        Integer, ForeignKey("tasks.id", ondelete="SET NULL"), nullable=True, index=True
+    )
     owner = relationship("User", back_populates="tasks")
     ml_subtasks = relationship(
-        "Subtask", back_populates="parent_task", cascade="all, delete-orphan"
+        "Subtask",
+        back_populates="parent_task",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     parent = relationship("Task", remote_side=[id], back_populates="child_tasks")
-    child_tasks = relationship("Task", foreign_keys=[parent_task_id])
+    child_tasks = relationship(
+        "Task", foreign_keys=[parent_task_id], passive_deletes=True
+    )
 
 
 class Subtask(Base):
@@ -29,5 +38,11 @@ class Subtask(Base):
     title = Column(String, nullable=False)
     description = Column(String, nullable=False)
     status = Column(String, default="pending")
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    task_id = Column(
+        Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     parent_task = relationship("Task", back_populates="ml_subtasks")
+
+
+search.attach(Task.__table__)
+search.attach(Subtask.__table__)
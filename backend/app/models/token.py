@@ -1,15 +1,20 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import CHAR, Column, DateTime, ForeignKey, Integer
 from sqlalchemy.sql import func
 
 from app.database import Base
 
 
 class RefreshToken(Base):
-    """Обновление токена."""
+    """Refresh-токен; в БД хранится только его SHA-256 (token_digest)."""
 
     __tablename__ = "refresh_tokens"
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    token = Column(String, unique=True, nullable=False)
-    expires_at = Column(DateTime(timezone=True), nullable=False)
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    token_hash = Column(CHAR(64), unique=True, index=True, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.agents.project_manager import project_manager_agent
 from app.core.auth import get_current_user
-from app.database import get_db
-from app.models.task import Subtask, Task
-from app.models.user import User
+from app.crud.split_job import create_split_job_async
+from app.database import get_async_db
+from app.models.task import Task
+from app.schemas.split_job import SplitJobRead
+from app.services.split_jobs import split_workers
+from app.services.user_cache import CachedUser
 
 router = APIRouter()
 
@@ -15,24 +18,19 @@ class TaskRequest(BaseModel):
     task: str
 
 
-@router.post("/tasks/{task_id}/split")
+@router.post("/tasks/{task_id}/split", status_code=202, response_model=SplitJobRead)
 async def split_task_into_subtasks(
     task_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    response: Response,
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    task = (
-        db.query(Task)
-        .filter(Task.id == task_id, Task.owner_id == current_user.id)
-        .first()
+    task_exists = await db.scalar(
+        select(Task.id).where(Task.id == task_id, Task.user_id == current_user.id)
     )
-    if not task:
+    if not task_exists:
         raise HTTPException(status_code=404, detail="Task not found")
-    result = await project_manager_agent(f"{task.title}: {task.description}")
-    for sub in result["subtasks"]:
-        db_sub = Subtask(
-            title=sub["title"], description=sub["description"], task_id=task_id
-        )
-        db.add(db_sub)
-    db.commit()
-    return result
+    job = await create_split_job_async(db, task_id=task_id, user_id=current_user.id)
+    split_workers.notify()
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return SplitJobRead.model_validate(job)
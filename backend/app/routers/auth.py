@@ -2,15 +2,18 @@ from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import create_access_token, create_refresh_token, verify_password
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    verify_password_async,
+)
 from app.core.tokens import get_token_from_request, verify_refresh_token
-from app.crud import token as crud_token
-from app.crud.token import create_refresh_token as create_db_token
-from app.database import get_db
-from app.models.user import User
+from app.crud.token import create_refresh_token_async, delete_refresh_token_async
+from app.crud.user import get_user_by_email_async
+from app.database import get_async_db
 from app.schemas.token import Token
 
 router = APIRouter()
@@ -18,11 +21,14 @@ router = APIRouter()
 
 @router.post("/login", response_model=Token)
 async def login(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db),
 ) -> dict:
     """Вход в систему."""
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await get_user_by_email_async(db, email=form_data.username)
+    if not user or not await verify_password_async(
+        form_data.password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -37,7 +43,7 @@ async def login(
         data={"sub": str(user.id)}, expires_delta=refresh_expires
     )
 
-    create_db_token(
+    await create_refresh_token_async(
         db=db,
         user_id=user.id,
         token=refresh_token,
@@ -52,18 +58,27 @@ async def login(
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_access_token(request: Request, db: Session = Depends(get_db)) -> dict:
+async def refresh_access_token(
+    request: Request, db: AsyncSession = Depends(get_async_db)
+) -> dict:
     """Обновление access-токена."""
     token = get_token_from_request(request)
-    current_user = verify_refresh_token(token, db)
-    crud_token.delete_refresh_token(db, token)
+    current_user = await verify_refresh_token(token, db)
+    await delete_refresh_token_async(db, token)
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     new_access_token = create_access_token(
         data={"sub": str(current_user.id)}, expires_delta=access_token_expires
     )
+    refresh_expires = timedelta(days=7)
     new_refresh_token = create_refresh_token(
-        data={"sub": str(current_user.id)}, expires_delta=timedelta(days=7)
+        data={"sub": str(current_user.id)}, expires_delta=refresh_expires
+    )
+    await create_refresh_token_async(
+        db=db,
+        user_id=current_user.id,
+        token=new_refresh_token,
+        expires_at=datetime.now(timezone.utc) + refresh_expires,
     )
     return {
         "access_token": new_access_token,
@@ -73,8 +88,8 @@ async def refresh_access_token(request: Request, db: Session = Depends(get_db))
 
 
 @router.post("/logout")
-async def logout(request: Request, db: Session = Depends(get_db)):
+async def logout(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Выход из системы."""
     token = get_token_from_request(request)
-    crud_token.delete_refresh_token(db, token)
+    await delete_refresh_token_async(db, token)
     return {"message": "Successfully logged out"}
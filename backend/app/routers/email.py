@@ -1,19 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.user import get_user_by_confirmation_token
-from app.database import get_db
+from app.crud.user import get_user_by_confirmation_token_async
+from app.database import get_async_db
+from app.services.user_cache import invalidate_user
 
 router = APIRouter()
 
 
 @router.get("/confirm-email/{token}")
-async def confirm_email(token: str, db: Session = Depends(get_db)):
+async def confirm_email(token: str, db: AsyncSession = Depends(get_async_db)):
     """Подтверждение email по токену."""
-    user = get_user_by_confirmation_token(db, token)
+    user = await get_user_by_confirmation_token_async(db, token)
     if not user:
         raise HTTPException(status_code=404, detail="Invalid or expired token")
     user.is_active = True
     user.confirmation_token = None
-    db.commit()
+    await db.commit()
+    invalidate_user(user.id)
     return {"message": "Email confirmed successfully!"}
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import get_current_user
+from app.crud.split_job import get_user_split_job_async
+from app.database import get_async_db
+from app.schemas.split_job import SplitJobRead
+from app.services.user_cache import CachedUser
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=SplitJobRead)
+async def read_job(
+    job_id: int,
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Состояние фоновой разбивки задачи."""
+    job = await get_user_split_job_async(db, job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return SplitJobRead.model_validate(job)
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agents.backends import agent_backends
+from app.agents.cache import agent_cache
+from app.agents.http import agent_http
+from app.agents.scheduler import agent_scheduler
+from app.agents.streaming import time_to_first_subtask
+from app.core.auth import get_current_admin_user
+from app.core.security import jwt_claims_cache
+from app.crud.agent_run import get_agent_runs_since_async
+from app.database import async_engine, engine, get_async_db
+from app.services.agent_runs import summarize_runs
+from app.services.db_pool import pool_status
+from app.services.http_metrics import route_metrics
+from app.services.maintenance import maintenance_sweeper
+from app.services.user_cache import CachedUser, user_cache
+
+router = APIRouter()
+
+AGENT_RUNS_SUMMARY_LIMIT = 10000
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Метрики HTTP в формате Prometheus (для скрейпера, без авторизации)."""
+    return PlainTextResponse(route_metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/db")
+async def db_metrics(current_user: CachedUser = Depends(get_current_admin_user)):
+    """Состояние пулов соединений с БД."""
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine),
+    }
+
+
+@router.get("/cache")
+async def cache_metrics(current_user: CachedUser = Depends(get_current_admin_user)):
+    """Размер и попадания кэшей пользователей, JWT и ответов агента."""
+    return {
+        "user": user_cache.stats(),
+        "jwt": jwt_claims_cache.stats(),
+        "agent": agent_cache.stats(),
+    }
+
+
+@router.get("/agent-http")
+async def agent_http_metrics(
+    current_user: CachedUser = Depends(get_current_admin_user),
+):
+    """Запросы к LLM в полёте и переиспользование соединений."""
+    return agent_http.stats()
+
+
+@router.get("/agents")
+async def agent_metrics(current_user: CachedUser = Depends(get_current_admin_user)):
+    """Серверы LLM, очередь к ним и задержки агентов."""
+    return {
+        "backends": agent_backends.stats(),
+        "scheduler": agent_scheduler.stats(),
+        "time_to_first_subtask_seconds": time_to_first_subtask.snapshot(),
+    }
+
+
+@router.get("/agent-runs")
+async def agent_run_metrics(
+    hours: int = Query(24, ge=1, le=24 * 30),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CachedUser = Depends(get_current_admin_user),
+):
+    """Задержки p50/p95 и скорость генерации по моделям за последние hours часов."""
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    runs = await get_agent_runs_since_async(db, since, AGENT_RUNS_SUMMARY_LIMIT)
+    return {"hours": hours, "runs": len(runs), "models": summarize_runs(runs)}
+
+
+@router.get("/maintenance")
+async def maintenance_metrics(
+    current_user: CachedUser = Depends(get_current_admin_user),
+):
+    """Сколько строк удалила периодическая очистка БД."""
+    return maintenance_sweeper.stats()
@@ -1,19 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
 
-from app.agents.project_manager import project_manager_agent
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agents.project_manager import (
+    project_manager_agent,
+    project_manager_agent_stream,
+)
+from app.agents.streaming import time_to_first_subtask
 from app.core.auth import get_current_user
+from app.core.config import settings
+from app.core.pagination import MAX_PAGE_SIZE, decode_cursor, paginate
+from app.crud.split_job import create_split_job_async
 from app.crud.task import (
-    create_task,
-    delete_task,
-    get_task_by_id,
-    get_tasks_by_user,
-    update_task,
+    create_subtasks_bulk_async,
+    create_task_async,
+    create_tasks_bulk_async,
+    delete_tasks_bulk_async,
+    delete_user_task_async,
+    get_owned_task_ids_async,
+    get_task_by_id_async,
+    get_task_tree_async,
+    get_tasks_by_user_async,
+    search_tasks_async,
+    update_tasks_bulk_async,
+    update_user_task_async,
 )
-from app.database import get_db
+from app.database import get_async_db
 from app.models.task import Subtask, Task
-from app.models.user import User
-from app.schemas.task import TaskCreate, TaskRead, TaskUpdate
+from app.schemas.split_job import SplitJobRead
+from app.schemas.substack import SubtaskRead
+from app.schemas.task import (
+    TaskBulkCreate,
+    TaskBulkDelete,
+    TaskBulkItemResult,
+    TaskBulkResult,
+    TaskBulkUpdate,
+    TaskCreate,
+    TaskRead,
+    TaskSearchRead,
+    TaskSplitBatch,
+    TaskSplitBatchItem,
+    TaskSplitBatchResult,
+    TaskTreeRead,
+    TaskUpdate,
+)
+from app.services.split_jobs import split_workers
+from app.services.sql_profiler import query_budget
+from app.services.user_cache import CachedUser
 
 router = APIRouter()
 
@@ -21,22 +60,142 @@ router = APIRouter()
 @router.post("/", response_model=TaskRead)
 async def create_new_task(
     task: TaskCreate,
-    cur_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cur_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Создание задачи."""
-    db_task = create_task(db=db, task=task, user_id=cur_user.id)
+    if task.parent_task_id is not None and not await get_owned_task_ids_async(
+        db, [task.parent_task_id], cur_user.id
+    ):
+        raise HTTPException(status_code=404, detail="Parent task not found")
+    db_task = await create_task_async(db=db, task=task, user_id=cur_user.id)
     return TaskRead.model_validate(db_task)
 
 
-@router.get("/{task_id}", response_model=TaskRead)
+def check_bulk_size(count: int) -> None:
+    if count > settings.TASK_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many items: max {settings.TASK_BULK_MAX_ITEMS}",
+        )
+
+
+@router.post("/bulk", response_model=TaskBulkResult)
+async def create_tasks_bulk(
+    payload: TaskBulkCreate,
+    cur_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Пакетное создание задач."""
+    check_bulk_size(len(payload.items))
+    parents = await get_owned_task_ids_async(
+        db,
+        [item.parent_task_id for item in payload.items if item.parent_task_id],
+        cur_user.id,
+    )
+    results: list[TaskBulkItemResult | None] = [None] * len(payload.items)
+    valid = []
+    for index, item in enumerate(payload.items):
+        if item.parent_task_id is not None and item.parent_task_id not in parents:
+            results[index] = TaskBulkItemResult(
+                index=index, ok=False, error="Parent task not found"
+            )
+        else:
+            valid.append(index)
+    created = await create_tasks_bulk_async(
+        db, [payload.items[index] for index in valid], cur_user.id
+    )
+    for index, db_task in zip(valid, created, strict=True):
+        results[index] = TaskBulkItemResult(
+            index=index, id=db_task.id, ok=True, task=TaskRead.model_validate(db_task)
+        )
+    return TaskBulkResult(results=results)
+
+
+@router.patch("/bulk", response_model=TaskBulkResult)
+async def update_tasks_bulk(
+    payload: TaskBulkUpdate,
+    cur_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Пакетное обновление задач."""
+    check_bulk_size(len(payload.items))
+    updated = await update_tasks_bulk_async(db, payload.items, cur_user.id)
+    results = []
+    for index, item in enumerate(payload.items):
+        db_task = updated.get(item.id)
+        if db_task is None:
+            results.append(
+                TaskBulkItemResult(
+                    index=index, id=item.id, ok=False, error="Task not found"
+                )
+            )
+        else:
+            results.append(
+                TaskBulkItemResult(
+                    index=index,
+                    id=item.id,
+                    ok=True,
+                    task=TaskRead.model_validate(db_task),
+                )
+            )
+    return TaskBulkResult(results=results)
+
+
+@router.delete("/bulk", response_model=TaskBulkResult)
+async def delete_tasks_bulk(
+    payload: TaskBulkDelete,
+    cur_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Пакетное удаление задач."""
+    check_bulk_size(len(payload.ids))
+    deleted = await delete_tasks_bulk_async(db, payload.ids, cur_user.id)
+    return TaskBulkResult(
+        results=[
+            TaskBulkItemResult(
+                index=index,
+                id=task_id,
+                ok=task_id in deleted,
+                error=None if task_id in deleted else "Task not found",
+            )
+            for index, task_id in enumerate(payload.ids)
+        ]
+    )
+
+
+@router.get(
+    "/search",
+    response_model=list[TaskSearchRead],
+    dependencies=[Depends(query_budget(2))],
+)
+async def search_user_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cur_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Полнотекстовый поиск по задачам пользователя и их подзадачам.
+
+    Объявлен до /{task_id}, иначе "search" разбирался бы как id.
+    """
+    found = await search_tasks_async(db, user_id=cur_user.id, query=q, limit=limit)
+    return [
+        TaskSearchRead(**TaskRead.model_validate(task).model_dump(), rank=rank)
+        for task, rank in found
+    ]
+
+
+@router.get(
+    "/{task_id}", response_model=TaskRead, dependencies=[Depends(query_budget(2))]
+)
 async def read_task(
     task_id: int,
-    cur_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cur_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Получение задачи по ID."""
-    db_task = get_task_by_id(db, task_id=task_id)
+    db_task = await get_task_by_id_async(db, task_id=task_id)
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
     if db_task.user_id != cur_user.id:
@@ -44,112 +203,286 @@ async def read_task(
     return TaskRead.model_validate(db_task)
 
 
-@router.get("/", response_model=list[TaskRead])
+@router.get("/", response_model=list[TaskRead], dependencies=[Depends(query_budget(2))])
 async def read_user_tasks(
-    skip: int = 0,
-    limit: int = 10,
-    cur_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    cur_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Получение всех задач пользователя."""
-    tasks = get_tasks_by_user(db, user_id=cur_user.id, skip=skip, limit=limit)
-    return [TaskRead.model_validate(task) for task in tasks]
+    """Получение всех задач пользователя.
+
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    """
+    tasks = await get_tasks_by_user_async(
+        db,
+        user_id=cur_user.id,
+        skip=skip,
+        limit=limit + 1,
+        after_id=decode_cursor(cursor) if cursor else None,
+    )
+    return [TaskRead.model_validate(task) for task in paginate(tasks, limit, response)]
 
 
 @router.put("/{task_id}", response_model=TaskRead)
 async def update__cur_task(
     task_id: int,
     task_update: TaskUpdate,
-    cur_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cur_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Обновление задачи."""
-    db_task = get_task_by_id(db, task_id=task_id)
-    if not db_task:
-        raise HTTPException(status_code=404, detail="task not found")
-    if db_task.user_id != cur_user.id:
-        raise HTTPException(status_code=403, detail="Not enouhg permissions")
-    updated_task = update_task(db, task_id=task_id, task_update=task_update)
+    updated_task = await update_user_task_async(
+        db, task_id=task_id, user_id=cur_user.id, task_update=task_update
+    )
+    if not updated_task:
+        raise HTTPException(status_code=404, detail="Task not found")
     return TaskRead.model_validate(updated_task)
 
 
 @router.delete("/{task_id}")
 async def delete__cur_task(
     task_id: int,
-    cur_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cur_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Удаление задачи."""
-    db_task = get_task_by_id(db, task_id=task_id)
-    if not db_task:
-        raise HTTPException(status_code=404, detail="task not found")
-    if db_task.user_id != cur_user.id:
-        raise HTTPException(status_code=403, detail="Not enouhg permissions")
-    success = delete_task(db, task_id=task_id)
+    success = await delete_user_task_async(db, task_id=task_id, user_id=cur_user.id)
     if not success:
         raise HTTPException(status_code=404, detail="Task not found")
     return {"message": "Task deleted successfully"}
 
 
-@router.get("/{task_id}/subtasks")
+@router.get("/{task_id}/subtasks", dependencies=[Depends(query_budget(3))])
 async def get_subtasks(
     task_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Получение подзадач."""
-    task = (
-        db.query(Task)
-        .filter(Task.id == task_id, Task.user_id == current_user.id)
-        .first()
+    task = await db.scalar(
+        select(Task).where(Task.id == task_id, Task.user_id == current_user.id)
     )
     if not task:
         raise HTTPException(404, "Task not found")
-    return task.ml_subtasks
+    subtasks = await db.scalars(select(Subtask).where(Subtask.task_id == task_id))
+    return list(subtasks)
+
+
+@router.get(
+    "/{task_id}/tree",
+    response_model=TaskTreeRead,
+    dependencies=[Depends(query_budget(3))],
+)
+async def get_task_tree(
+    task_id: int,
+    depth: int | None = Query(None, ge=0),
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Дерево задачи: дочерние задачи и подзадачи ИИ на всю глубину или до depth."""
+    max_depth = settings.TASK_TREE_MAX_DEPTH
+    if depth is not None:
+        max_depth = min(depth, max_depth)
+    tasks, subtasks = await get_task_tree_async(
+        db, task_id=task_id, user_id=current_user.id, max_depth=max_depth
+    )
+    if not tasks:
+        raise HTTPException(404, "Task not found")
+    nodes = {task.id: TaskTreeRead.model_validate(task) for task in tasks}
+    for subtask in subtasks:
+        nodes[subtask.task_id].subtasks.append(SubtaskRead.model_validate(subtask))
+    # Цикл в parent_task_id (записанный в обход API) повторяет узлы в CTE;
+    # такие рёбра пропускаются, иначе узел попадёт в собственных потомков.
+    visited = {task_id}
+    for task in tasks[1:]:
+        if task.id in visited or task.parent_task_id == task.id:
+            continue
+        visited.add(task.id)
+        nodes[task.parent_task_id].children.append(nodes[task.id])
+    return nodes[task_id]
 
 
 @router.put("/subtasks/{subtask_id}")
 async def update_subtask_status(
     subtask_id: int,
     status: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Изменение статутса подзадачи."""
-    subtask = (
-        db.query(Subtask)
+    subtask = await db.scalar(
+        select(Subtask)
         .join(Task)
-        .filter(Subtask.id == subtask_id, Task.user_id == current_user.id)
-        .first()
+        .where(Subtask.id == subtask_id, Task.user_id == current_user.id)
     )
 
     if not subtask:
         raise HTTPException(404, "Subtask not found")
 
     subtask.status = status
-    db.commit()
+    await db.commit()
     return {"message": "Status updated"}
 
 
-@router.post("/{task_id}/split")
+@router.post("/split-batch", response_model=TaskSplitBatchResult)
+async def split_tasks_batch(
+    payload: TaskSplitBatch,
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Разбить несколько задач на подзадачи с параллельными обращениями к AI.
+
+    Не больше SPLIT_BATCH_CONCURRENCY генераций одновременно; подзадачи
+    всех задач сохраняются одной транзакцией.
+    """
+    started = time.perf_counter()
+    task_ids = list(dict.fromkeys(payload.task_ids))
+    if len(task_ids) > settings.SPLIT_BATCH_MAX_TASKS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many tasks: max {settings.SPLIT_BATCH_MAX_TASKS}",
+        )
+    rows = await db.execute(
+        select(Task.id, Task.title, Task.description).where(
+            Task.id.in_(task_ids), Task.user_id == current_user.id
+        )
+    )
+    descriptions = {row.id: f"{row.title}: {row.description}" for row in rows}
+    # Соединение не держим, пока идёт генерация.
+    await db.commit()
+
+    semaphore = asyncio.Semaphore(settings.SPLIT_BATCH_CONCURRENCY)
+
+    async def split_one(task_id: int) -> tuple[TaskSplitBatchItem, list[dict]]:
+        if task_id not in descriptions:
+            return (
+                TaskSplitBatchItem(task_id=task_id, ok=False, error="Task not found"),
+                [],
+            )
+        async with semaphore:
+            item_started = time.perf_counter()
+            try:
+                result = await project_manager_agent(
+                    descriptions[task_id], user_id=current_user.id, task_id=task_id
+                )
+                error = None
+            except Exception as e:
+                result, error = None, str(e) or type(e).__name__
+            seconds = time.perf_counter() - item_started
+        item = TaskSplitBatchItem(
+            task_id=task_id, ok=error is None, error=error, seconds=seconds
+        )
+        if result is None:
+            return item, []
+        return item, [
+            {
+                "title": sub["title"],
+                "description": sub["description"],
+                "task_id": task_id,
+            }
+            for sub in result["subtasks"]
+        ]
+
+    outcomes = await asyncio.gather(*(split_one(task_id) for task_id in task_ids))
+    created = await create_subtasks_bulk_async(
+        db, [row for _, generated in outcomes for row in generated]
+    )
+    by_task: dict[int, list[SubtaskRead]] = {}
+    for db_sub in created:
+        by_task.setdefault(db_sub.task_id, []).append(
+            SubtaskRead.model_validate(db_sub)
+        )
+    results = [item for item, _ in outcomes]
+    for item in results:
+        item.subtasks = by_task.get(item.task_id, [])
+    return TaskSplitBatchResult(results=results, seconds=time.perf_counter() - started)
+
+
+@router.post("/{task_id}/split", status_code=202, response_model=SplitJobRead)
 async def split_task_into_subtasks(
     task_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    response: Response,
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Поставить разбивку задачи на подзадачи с помощью AI в очередь."""
+    task_exists = await db.scalar(
+        select(Task.id).where(Task.id == task_id, Task.user_id == current_user.id)
+    )
+    if not task_exists:
+        raise HTTPException(404, "Task not found")
+    job = await create_split_job_async(db, task_id=task_id, user_id=current_user.id)
+    split_workers.notify()
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return SplitJobRead.model_validate(job)
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Сообщение Server-Sent Events."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/{task_id}/split/stream")
+async def split_task_stream(
+    task_id: int,
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Разбить задачу на подзадачи с помощью AI."""
-    task = (
-        db.query(Task)
-        .filter(Task.id == task_id, Task.user_id == current_user.id)
-        .first()
+    """Разбить задачу на подзадачи с выдачей каждой подзадачи по готовности (SSE).
+
+    События: subtask — сохранённая подзадача, done — лог рассуждений,
+    error — сбой генерации (уже сохранённые подзадачи остаются).
+    Если очередь к LLM переполнена — 429 с Retry-After.
+    """
+    started = time.perf_counter()
+    task = await db.scalar(
+        select(Task).where(Task.id == task_id, Task.user_id == current_user.id)
     )
     if not task:
         raise HTTPException(404, "Task not found")
-    result = await project_manager_agent(f"{task.title}: {task.description}")
-    for sub in result["subtasks"]:
-        db_sub = Subtask(
-            title=sub["title"], description=sub["description"], task_id=task_id
-        )
-        db.add(db_sub)
-    db.commit()
-    return result
+    # Соединение не держим, пока ждём слот и идёт генерация.
+    await db.commit()
+    agent_events = project_manager_agent_stream(
+        f"{task.title}: {task.description}", user_id=current_user.id, task_id=task_id
+    )
+    # Ждём слот в очереди к LLM до отправки заголовков: при переполнении
+    # клиент получает 429, а не поток с ошибкой.
+    await anext(agent_events)
+
+    async def events() -> AsyncIterator[str]:
+        count = 0
+        try:
+            async for kind, payload in agent_events:
+                if kind == "done":
+                    yield sse_event(
+                        "done",
+                        {
+                            "count": count,
+                            "reasoning_log": payload.get("reasoning_log", []),
+                        },
+                    )
+                    continue
+                db_sub = Subtask(
+                    title=payload["title"],
+                    description=payload.get("description", ""),
+                    task_id=task_id,
+                )
+                db.add(db_sub)
+                await db.commit()
+                if count == 0:
+                    time_to_first_subtask.observe(time.perf_counter() - started)
+                count += 1
+                yield sse_event(
+                    "subtask", SubtaskRead.model_validate(db_sub).model_dump()
+                )
+        except Exception as e:
+            yield sse_event("error", {"count": count, "detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
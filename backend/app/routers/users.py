@@ -1,34 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.auth import get_current_admin_user, get_current_user
+from app.core.pagination import MAX_PAGE_SIZE, decode_cursor, paginate
+from app.core.security import get_password_hash_async
 from app.crud.user import (
-    create_user,
-    delete_user,
-    get_all_users,
-    get_user_by_email,
-    update_user,
+    create_user_async,
+    delete_user_async,
+    get_all_users_async,
+    get_user_by_email_async,
+    update_user_async,
 )
-from app.database import get_db
-from app.models.user import User
+from app.database import get_async_db
 from app.schemas.user import UserCreate, UserList, UserRead, UserUpdate
+from app.services.user_cache import CachedUser
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=UserRead)
-async def read_users_me(cur_user: User = Depends(get_current_user)):
+async def read_users_me(cur_user: CachedUser = Depends(get_current_user)):
     """Получение информации о пользователе."""
     return UserRead.from_orm(cur_user)
 
 
 @router.post("/", response_model=UserRead)
 async def create_user_endpoint(
-    user: UserCreate, db: Session = Depends(get_db)
+    user: UserCreate, db: AsyncSession = Depends(get_async_db)
 ) -> UserRead:
     """Создание пользователя."""
+    hashed_password = await get_password_hash_async(user.password)
     try:
-        return create_user(db=db, user=user)
+        return await create_user_async(
+            db=db, user=user, hashed_password=hashed_password
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
@@ -36,8 +41,8 @@ async def create_user_endpoint(
 
 
 @router.get("/{email}", response_model=UserRead)
-async def get_user(email: str, db: Session = Depends(get_db)):
-    db_user = get_user_by_email(db, email=email)
+async def get_user(email: str, db: AsyncSession = Depends(get_async_db)):
+    db_user = await get_user_by_email_async(db, email=email)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
@@ -46,12 +51,20 @@ async def get_user(email: str, db: Session = Depends(get_db)):
 @router.put("/me", response_model=UserRead)
 async def update_user_me(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Обновление профиля текущего пользователя."""
+    hashed_password = None
+    if user_update.password:
+        hashed_password = await get_password_hash_async(user_update.password)
     try:
-        updated_user = update_user(db, user_id=current_user.id, user_update=user_update)
+        updated_user = await update_user_async(
+            db,
+            user_id=current_user.id,
+            user_update=user_update,
+            hashed_password=hashed_password,
+        )
         return UserRead.from_orm(updated_user)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
@@ -59,24 +72,34 @@ async def update_user_me(
 
 @router.get("/", response_model=list[UserList])
 async def get_users(
-    skip: int = 0,
-    limit: int = 10,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CachedUser = Depends(get_current_admin_user),
 ):
-    """Получение списка всех пользователей."""
-    users = get_all_users(db, skip=skip, limit=limit)
-    return [UserList.from_orm(user) for user in users]
+    """Получение списка всех пользователей.
+
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    """
+    users = await get_all_users_async(
+        db,
+        skip=skip,
+        limit=limit + 1,
+        after_id=decode_cursor(cursor) if cursor else None,
+    )
+    return [UserList.from_orm(user) for user in paginate(users, limit, response)]
 
 
 @router.delete("/{user_id}")
 async def delete_user_endpoint(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CachedUser = Depends(get_current_admin_user),
 ) -> dict:
     """Удаление пользователя по id."""
-    success = delete_user(db, user_id=user_id)
+    success = await delete_user_async(db, user_id=user_id)
     if not success:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": "User deleted successfully"}
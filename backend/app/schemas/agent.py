@@ -0,0 +1,18 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class AgentSubtask(BaseModel):
+    """Подзадача в ответе агента."""
+
+    id: Optional[int] = None
+    title: str = Field(min_length=1)
+    description: str = ""
+
+
+class AgentSplitResult(BaseModel):
+    """Ответ агента на разбивку задачи."""
+
+    reasoning_log: list[str] = []
+    subtasks: list[AgentSubtask] = Field(min_length=1)
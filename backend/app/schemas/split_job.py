@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+
+class SplitJobRead(BaseModel):
+    """Состояние фоновой разбивки задачи."""
+
+    id: int
+    task_id: int
+    status: str
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,7 +1,9 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
+
+from .substack import SubtaskRead
 
 
 class TaskBase(BaseModel):
@@ -36,3 +38,87 @@ class TaskUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     status: Optional[str] = None
+
+
+class TaskSearchRead(TaskRead):
+    """Найденная задача с баллом релевантности."""
+
+    rank: float
+
+
+class TaskTreeRead(TaskRead):
+    """Задача вместе с подзадачами ИИ и дочерними задачами."""
+
+    subtasks: list[SubtaskRead] = []
+    children: list["TaskTreeRead"] = []
+
+
+class TaskBulkCreate(BaseModel):
+    """Пакетное создание задач."""
+
+    items: list[TaskCreate]
+
+
+class TaskBulkUpdateItem(TaskUpdate):
+    """Изменение одной задачи в пакете."""
+
+    id: int
+
+    @field_validator("title")
+    @classmethod
+    def title_not_null(cls, title: Optional[str]) -> str:
+        """title в базе NOT NULL: явный null отклоняется с 422."""
+        if title is None:
+            raise ValueError("title may not be null")
+        return title
+
+
+class TaskBulkUpdate(BaseModel):
+    """Пакетное обновление задач."""
+
+    items: list[TaskBulkUpdateItem]
+
+
+class TaskBulkDelete(BaseModel):
+    """Пакетное удаление задач."""
+
+    ids: list[int]
+
+
+class TaskBulkItemResult(BaseModel):
+    """Результат по одному элементу пакета."""
+
+    index: int
+    id: Optional[int] = None
+    ok: bool
+    error: Optional[str] = None
+    task: Optional[TaskRead] = None
+
+
+class TaskBulkResult(BaseModel):
+    """Результаты пакетной операции в порядке элементов запроса."""
+
+    results: list[TaskBulkItemResult]
+
+
+class TaskSplitBatch(BaseModel):
+    """Пакетная разбивка задач на подзадачи."""
+
+    task_ids: list[int]
+
+
+class TaskSplitBatchItem(BaseModel):
+    """Результат разбивки одной задачи пакета."""
+
+    task_id: int
+    ok: bool
+    error: Optional[str] = None
+    subtasks: list[SubtaskRead] = []
+    seconds: float = 0.0
+
+
+class TaskSplitBatchResult(BaseModel):
+    """Результаты пакетной разбивки в порядке task_ids."""
+
+    results: list[TaskSplitBatchItem]
+    seconds: float
@@ -0,0 +1,118 @@
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.agent_run import create_agent_run_async
+from app.database import AsyncSessionLocal
+from app.models.agent_run import AgentRun
+from app.services.metrics import percentile
+
+logger = logging.getLogger(__name__)
+
+NANOSECONDS = 1e9
+
+
+@dataclass
+class AgentRunStats:
+    """Время и токены одного вызова агента (по всем попыткам)."""
+
+    agent: str
+    task_id: int | None = None
+    user_id: int | None = None
+    model: str | None = None
+    backend_url: str | None = None
+    status: str = "ok"
+    error: str | None = None
+    attempts: int = 0
+    queue_seconds: float = 0.0
+    total_seconds: float = 0.0
+    load_seconds: float = 0.0
+    prompt_eval_count: int = 0
+    prompt_eval_seconds: float = 0.0
+    eval_count: int = 0
+    eval_seconds: float = 0.0
+    started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def add_ollama_stats(self, payload: dict[str, Any]) -> None:
+        """Счётчики из финального ответа Ollama (длительности в наносекундах)."""
+        self.attempts += 1
+        self.load_seconds += payload.get("load_duration", 0) / NANOSECONDS
+        self.prompt_eval_count += payload.get("prompt_eval_count", 0)
+        self.prompt_eval_seconds += payload.get("prompt_eval_duration", 0) / NANOSECONDS
+        self.eval_count += payload.get("eval_count", 0)
+        self.eval_seconds += payload.get("eval_duration", 0) / NANOSECONDS
+
+    def fail(self, error: BaseException) -> None:
+        self.status = "error"
+        self.error = str(error) or type(error).__name__
+
+    def finish(self) -> None:
+        self.total_seconds = time.perf_counter() - self.started
+
+
+class AgentRunRecorder:
+    """Сохранение AgentRunStats в таблицу agent_runs.
+
+    Ошибка записи не должна ломать разбивку, поэтому только логируется.
+    """
+
+    def __init__(
+        self, session_factory: Callable[[], AsyncSession] = AsyncSessionLocal
+    ) -> None:
+        self.session_factory = session_factory
+
+    async def record(self, run: AgentRunStats) -> None:
+        run.finish()
+        fields = asdict(run)
+        fields.pop("started")
+        try:
+            async with self.session_factory() as db:
+                await create_agent_run_async(db, **fields)
+        except Exception:
+            logger.exception("failed to record agent run")
+
+
+def summarize_runs(runs: list[AgentRun]) -> dict[str, dict[str, Any]]:
+    """Агрегаты по моделям: задержки p50/p95, токены и скорость генерации."""
+    by_model: dict[str, list[AgentRun]] = {}
+    for run in runs:
+        by_model.setdefault(run.model or "unknown", []).append(run)
+    summary = {}
+    for model, model_runs in sorted(by_model.items()):
+        ok = [run for run in model_runs if run.status == "ok"]
+        total = [run.total_seconds for run in ok]
+        queue = [run.queue_seconds for run in model_runs]
+        eval_seconds = sum(run.eval_seconds for run in ok)
+        prompt_seconds = sum(run.prompt_eval_seconds for run in ok)
+        summary[model] = {
+            "runs": len(model_runs),
+            "errors": len(model_runs) - len(ok),
+            "latency_p50": percentile(total, 50),
+            "latency_p95": percentile(total, 95),
+            "queue_p50": percentile(queue, 50),
+            "queue_p95": percentile(queue, 95),
+            "prompt_tokens_avg": (
+                sum(run.prompt_eval_count for run in ok) / len(ok) if ok else None
+            ),
+            "eval_tokens_avg": (
+                sum(run.eval_count for run in ok) / len(ok) if ok else None
+            ),
+            "prompt_tokens_per_second": (
+                sum(run.prompt_eval_count for run in ok) / prompt_seconds
+                if prompt_seconds
+                else None
+            ),
+            "eval_tokens_per_second": (
+                sum(run.eval_count for run in ok) / eval_seconds
+                if eval_seconds
+                else None
+            ),
+        }
+    return summary
+
+
+agent_run_recorder = AgentRunRecorder()
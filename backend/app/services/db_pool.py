@@ -0,0 +1,73 @@
+import time
+
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.core.config import settings
+from app.services.metrics import Histogram
+
+
+class _TimedCheckoutMixin:
+    """Замер времени ожидания свободного соединения в пуле."""
+
+    wait_time: Histogram
+    timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            type(self).timeouts += 1
+            raise
+        finally:
+            self.wait_time.observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    """QueuePool синхронного движка с гистограммой ожидания."""
+
+    wait_time = Histogram()
+
+
+class TimedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """Пул асинхронного движка с гистограммой ожидания."""
+
+    wait_time = Histogram()
+
+
+def pool_options(url: str, async_engine: bool = False) -> dict:
+    """Параметры пула для create_engine из настроек.
+
+    SQLite в памяти живёт в одном соединении, для него пул не настраиваем.
+    """
+    if make_url(url).database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": TimedAsyncQueuePool if async_engine else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def pool_status(engine: Engine) -> dict:
+    """Текущее состояние пула соединений движка."""
+    pool: Pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+    status = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "timeout": pool.timeout(),
+    }
+    if isinstance(pool, _TimedCheckoutMixin):
+        status["timeouts"] = type(pool).timeouts
+        status["wait_seconds"] = pool.wait_time.snapshot()
+    return status
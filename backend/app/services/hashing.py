@@ -0,0 +1,58 @@
+import asyncio
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+
+class ExecutorSaturatedError(Exception):
+    """Очередь пула переполнена."""
+
+
+class BoundedExecutor:
+    """Пул потоков для CPU-тяжёлых вызовов с ограничением очереди.
+
+    Если одновременно ожидают выполнения max_pending вызовов, новый вызов
+    сразу получает ExecutorSaturatedError. При max_workers <= 0 функция
+    выполняется прямо в event loop.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, name: str) -> None:
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.name = name
+        self.pending = 0
+        self.rejected = 0
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+            return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Выполнение fn(*args) в пуле."""
+        if self.max_workers <= 0:
+            return fn(*args)
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorSaturatedError(f"{self.name} queue is full")
+            self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def shutdown(self) -> None:
+        """Остановка пула; при следующем вызове он будет создан заново."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,238 @@
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.services.metrics import Histogram
+
+SERVER_TIMING_HEADER = b"server-timing"
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestTiming:
+    """Время одного HTTP-запроса по фазам, в секундах.
+
+    Фазы могут пересекаться: auth включает запрос пользователя в БД,
+    а параллельные вызовы LLM суммируются.
+    """
+
+    __slots__ = ("auth", "db", "llm")
+
+    def __init__(self) -> None:
+        self.auth = 0.0
+        self.db = 0.0
+        self.llm = 0.0
+
+    def header(self, total: float) -> bytes:
+        """Значение заголовка Server-Timing (длительности в миллисекундах)."""
+        return b"auth;dur=%.2f, db;dur=%.2f, llm;dur=%.2f, total;dur=%.2f" % (
+            self.auth * 1000,
+            self.db * 1000,
+            self.llm * 1000,
+            total * 1000,
+        )
+
+
+_current_timing: ContextVar[RequestTiming | None] = ContextVar(
+    "request_timing", default=None
+)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Добавляет время блока к фазе текущего HTTP-запроса."""
+    timing = _current_timing.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timing is not None:
+            setattr(timing, phase, getattr(timing, phase) + time.perf_counter() - start)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_timing.get() is not None:
+        conn.info.setdefault("server_timing_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timing = _current_timing.get()
+    starts = conn.info.get("server_timing_start")
+    if timing is not None and starts:
+        timing.db += time.perf_counter() - starts.pop()
+
+
+def install(engine: Engine) -> None:
+    """Подключение замера времени SQL к движку."""
+    for name, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+    ):
+        if not event.contains(engine, name, listener):
+            event.listen(engine, name, listener)
+
+
+class RouteMetrics:
+    """Число запросов и гистограммы задержек по (метод, шаблон маршрута, статус)."""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self._histograms: dict[tuple[str, str, int], Histogram] = {}
+        # (id маршрута, метод, статус) -> (маршрут, префикс пути, гистограмма);
+        # APIRoute не хешируется, поэтому ключ — id, а маршрут сверяется по is.
+        self._by_route: dict[tuple[int, str, int], tuple[Any, str, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, method: str, route: str, status: int) -> Histogram:
+        key = (method, route, status)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        return histogram
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        self.histogram(method, route, status).observe(seconds)
+
+    def observe_request(self, scope, status: int, seconds: float) -> None:
+        """observe() для ASGI-запроса.
+
+        Шаблон маршрута и гистограмма серии запоминаются по объекту маршрута,
+        так что разбор пути выполняется только на первом запросе серии.
+        Префикс сверяется с путём на случай роутера под несколькими префиксами.
+        """
+        route = scope.get("route")
+        key = (id(route), scope["method"], status)
+        cached = self._by_route.get(key)
+        if (
+            cached is None
+            or cached[0] is not route
+            or not scope["path"].startswith(cached[1])
+        ):
+            prefix, path_format = split_route(scope)
+            histogram = self.histogram(key[1], prefix + path_format, status)
+            cached = self._by_route[key] = (route, prefix, histogram)
+        cached[2].observe(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms = {}
+            self._by_route = {}
+
+    def render(self) -> str:
+        """Экспорт в текстовом формате Prometheus."""
+        series = sorted(self._histograms.items())
+        lines = [
+            "# HELP http_requests_in_flight HTTP requests being processed.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_requests_total HTTP requests by route template and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        snapshots = [(_labels(key), histogram.snapshot()) for key, histogram in series]
+        for labels, snapshot in snapshots:
+            lines.append(f"http_requests_total{{{labels}}} {snapshot['count']}")
+        lines += [
+            "# HELP http_request_duration_seconds HTTP request latency.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for labels, snapshot in snapshots:
+            for bound, count in snapshot["buckets"].items():
+                lines.append(
+                    f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} '
+                    f"{count}"
+                )
+            lines.append(
+                f"http_request_duration_seconds_sum{{{labels}}} {snapshot['sum']}"
+            )
+            lines.append(
+                f"http_request_duration_seconds_count{{{labels}}} {snapshot['count']}"
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: tuple[str, str, int]) -> str:
+    method, route, status = key
+    return f'method="{method}",route="{_escape(route)}",status="{status}"'
+
+
+def split_route(scope) -> tuple[str, str]:
+    """Префикс подключённого роутера и шаблон маршрута запроса.
+
+    path_format маршрута во вложенном роутере не содержит префикса
+    (``/{task_id}``), поэтому префикс восстанавливается из пути запроса:
+    подставляем path_params в шаблон и отрезаем совпавший хвост.
+    """
+    path_format = getattr(scope.get("route"), "path_format", None)
+    if path_format is None:
+        return "", UNMATCHED_ROUTE
+    path = scope["path"]
+    suffix = path_format
+    if "{" in path_format:
+        try:
+            suffix = path_format.format_map(scope.get("path_params", {}))
+        except (KeyError, IndexError, ValueError):
+            return "", path_format
+    if not path.endswith(suffix):
+        return "", path_format
+    return path[: len(path) - len(suffix)], path_format
+
+
+def route_template(scope) -> str:
+    """Шаблон маршрута запроса с префиксом подключённого роутера."""
+    prefix, path_format = split_route(scope)
+    return prefix + path_format
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: метрики по шаблону маршрута и заголовок Server-Timing.
+
+    Серии размечаются шаблоном маршрута (``/tasks/{task_id}``), поэтому их
+    число не зависит от id в путях.
+    """
+
+    def __init__(self, app, metrics: RouteMetrics | None = None) -> None:
+        self.app = app
+        self.metrics = metrics or route_metrics
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        timing = RequestTiming()
+        token = _current_timing.set(timing)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = timing.header(time.perf_counter() - start)
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (SERVER_TIMING_HEADER, header),
+                ]
+            await send(message)
+
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            metrics.in_flight -= 1
+            _current_timing.reset(token)
+            metrics.observe_request(scope, status, time.perf_counter() - start)
+
+
+route_metrics = RouteMetrics()
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.token import delete_expired_refresh_tokens_async
+from app.crud.user import delete_unconfirmed_users_async
+from app.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class MaintenanceSweeper:
+    """Периодическая очистка истёкших refresh-токенов и неподтверждённых аккаунтов.
+
+    Строки удаляются пачками по MAINTENANCE_BATCH_SIZE, каждая пачка —
+    отдельная короткая транзакция, поэтому таблицы не блокируются надолго.
+    """
+
+    def __init__(
+        self, session_factory: Callable[[], AsyncSession] = AsyncSessionLocal
+    ) -> None:
+        self.session_factory = session_factory
+        self._task: asyncio.Task | None = None
+        self.runs = 0
+        self.last_run: dict[str, Any] | None = None
+        self.removed_total = {"refresh_tokens": 0, "users": 0}
+
+    async def _sweep(
+        self,
+        delete_batch: Callable[[AsyncSession, datetime, int], Awaitable[int]],
+        before: datetime,
+        batch_size: int,
+    ) -> int:
+        removed = 0
+        while True:
+            async with self.session_factory() as db:
+                deleted = await delete_batch(db, before, batch_size)
+            removed += deleted
+            if deleted < batch_size:
+                return removed
+            # Между пачками отдаём event loop обработке запросов.
+            await asyncio.sleep(0)
+
+    async def run_once(self) -> dict[str, int]:
+        """Один проход очистки; число удалённых строк по таблицам."""
+        start = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        batch_size = settings.MAINTENANCE_BATCH_SIZE
+        removed = {
+            "refresh_tokens": await self._sweep(
+                delete_expired_refresh_tokens_async,
+                now - timedelta(hours=settings.EXPIRED_TOKEN_RETENTION_HOURS),
+                batch_size,
+            ),
+            "users": await self._sweep(
+                delete_unconfirmed_users_async,
+                now - timedelta(hours=settings.UNCONFIRMED_USER_RETENTION_HOURS),
+                batch_size,
+            ),
+        }
+        self.runs += 1
+        for table, count in removed.items():
+            self.removed_total[table] += count
+        self.last_run = {
+            "at": now.isoformat(),
+            "seconds": time.perf_counter() - start,
+            "removed": removed,
+        }
+        logger.info("maintenance sweep removed %s", removed)
+        return removed
+
+    async def _loop(self, interval: float) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("maintenance sweep failed")
+            await asyncio.sleep(interval)
+
+    async def start(self, interval: float) -> None:
+        """Запуск периодической очистки (из lifespan); interval <= 0 — выключено."""
+        if interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._loop(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "runs": self.runs,
+            "removed_total": dict(self.removed_total),
+            "last_run": self.last_run,
+        }
+
+
+maintenance_sweeper = MaintenanceSweeper()
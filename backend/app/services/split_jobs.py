@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from collections.abc import Callable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agents import project_manager
+from app.agents.scheduler import AgentOverloadedError
+from app.core.config import settings
+from app.crud.split_job import (
+    claim_split_job_async,
+    finish_split_job_async,
+    requeue_split_jobs_async,
+    requeue_stale_split_jobs_async,
+)
+from app.database import AsyncSessionLocal
+from app.models.split_job import SplitJob
+from app.models.task import Subtask, Task
+
+logger = logging.getLogger(__name__)
+
+
+class SplitJobWorkers:
+    """Пул asyncio-воркеров, выполняющих разбивки из таблицы split_jobs.
+
+    Очередь живёт в БД, поэтому внешний брокер не нужен, а воркеры разных
+    процессов не мешают друг другу. Сессия БД открывается только на чтение
+    задачи и запись результата, на время генерации соединение свободно.
+    """
+
+    def __init__(
+        self, session_factory: Callable[[], AsyncSession] = AsyncSessionLocal
+    ) -> None:
+        self.session_factory = session_factory
+        self._tasks: list[asyncio.Task] = []
+        self._running: set[int] = set()
+        self._wakeup = asyncio.Event()
+
+    def notify(self) -> None:
+        """Сигнал о новом задании: воркеры не ждут следующего опроса."""
+        self._wakeup.set()
+
+    async def run_once(self) -> bool:
+        """Выполнение одного задания из очереди; False, если очередь пуста."""
+        async with self.session_factory() as db:
+            job = await claim_split_job_async(db)
+            if job is None:
+                return False
+            task = await db.scalar(select(Task).where(Task.id == job.task_id))
+            description = f"{task.title}: {task.description}" if task else None
+        self._running.add(job.id)
+        try:
+            processed = await self._run_job(job, description)
+        except Exception:
+            self._running.discard(job.id)
+            raise
+        # При отмене (stop) id остаётся в _running, и stop() вернёт задание
+        # в очередь.
+        self._running.discard(job.id)
+        return processed
+
+    async def _run_job(self, job: SplitJob, description: str | None) -> bool:
+        """Генерация и запись результата; False, если задание вернулось в очередь."""
+        result, error = None, None
+        if description is None:
+            error = "Task not found"
+        else:
+            try:
+                result = await project_manager.project_manager_agent(
+                    description, user_id=job.user_id, task_id=job.task_id
+                )
+            except AgentOverloadedError:
+                # Очередь к LLM полна: задание ждёт следующего опроса.
+                async with self.session_factory() as db:
+                    await requeue_split_jobs_async(db, {job.id})
+                return False
+            except Exception as e:
+                error = str(e) or type(e).__name__
+
+        try:
+            async with self.session_factory() as db:
+                if result is not None:
+                    db.add_all(
+                        Subtask(
+                            title=sub["title"],
+                            description=sub["description"],
+                            task_id=job.task_id,
+                        )
+                        for sub in result["subtasks"]
+                    )
+                await finish_split_job_async(db, job.id, result=result, error=error)
+        except Exception as e:
+            # Результат не записался (например, задачу удалили во время
+            # генерации): сессия откатила транзакцию, а задание помечается
+            # упавшим, чтобы не остаться в running до перезапуска.
+            logger.exception("split job %s result was not saved", job.id)
+            async with self.session_factory() as db:
+                await finish_split_job_async(
+                    db, job.id, error=str(e) or type(e).__name__
+                )
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                while await self.run_once():
+                    pass
+            except Exception:
+                logger.exception("split job worker failed")
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), settings.SPLIT_JOB_POLL_INTERVAL
+                )
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def start(self, workers: int) -> None:
+        """Запуск воркеров (из lifespan) с возвратом зависших заданий в очередь."""
+        if workers <= 0:
+            return
+        async with self.session_factory() as db:
+            await requeue_stale_split_jobs_async(db, settings.SPLIT_JOB_STALE_SECONDS)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(workers)]
+
+    async def stop(self) -> None:
+        """Остановка воркеров с возвратом прерванных заданий в очередь."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._running:
+            async with self.session_factory() as db:
+                await requeue_split_jobs_async(db, self._running)
+            self._running.clear()
+
+
+split_workers = SplitJobWorkers()
@@ -0,0 +1,224 @@
+import logging
+import re
+import sys
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+try:
+    import greenlet
+except ImportError:  # pragma: no cover - greenlet ставится вместе с SQLAlchemy
+    greenlet = None
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+QUERY_BUDGET_HEADER = "X-Query-Budget"
+
+_APP_DIR = str(Path(__file__).resolve().parent.parent)
+_SPACES = re.compile(r"\s+")
+_LITERALS = re.compile(
+    r"'(?:[^']|'')*'"  # строки
+    r"|\b\d+(?:\.\d+)?\b"  # числа
+    r"|%\(\w+\)s|%s|\$\d+|(?<!:):\w+|\?"  # параметры драйверов
+)
+_IN_LISTS = re.compile(r"\(\?(?:, \?)+\)")
+
+
+def normalize_sql(statement: str) -> str:
+    """SQL без литералов и параметров: одинаковые запросы дают одну строку."""
+    sql = _LITERALS.sub("?", _SPACES.sub(" ", statement).strip())
+    return _IN_LISTS.sub("(?, ...)", sql)
+
+
+def call_site() -> str:
+    """Ближайший кадр кода приложения, из которого выполняется запрос.
+
+    Асинхронная сессия выполняет SQL в дочернем greenlet, поэтому после
+    его кадров поиск продолжается в родительском.
+    """
+    frame = sys._getframe(1)
+    current = greenlet.getcurrent() if greenlet is not None else None
+    while True:
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(_APP_DIR) and filename != __file__:
+                relative = Path(filename).relative_to(Path(_APP_DIR).parent)
+                return f"{relative}:{frame.f_lineno} in {frame.f_code.co_name}"
+            frame = frame.f_back
+        current = current.parent if current is not None else None
+        if current is None:
+            return "unknown"
+        frame = current.gr_frame
+
+
+@dataclass
+class QueryStats:
+    """SQL-запросы, выполненные в рамках одного HTTP-запроса."""
+
+    statements: list[str] = field(default_factory=list)
+    repeats: Counter = field(default_factory=Counter)
+    parameters: dict[str, set[str]] = field(default_factory=dict)
+    call_sites: dict[str, str] = field(default_factory=dict)
+    budget: int | None = None
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def record(self, statement: str, parameters) -> None:
+        self.statements.append(statement)
+        self.repeats[statement] += 1
+        self.parameters.setdefault(statement, set()).add(repr(parameters))
+        if self.repeats[statement] == settings.SQL_N_PLUS_ONE_THRESHOLD:
+            self.call_sites[statement] = call_site()
+
+    def n_plus_one(self, threshold: int | None = None) -> list[tuple[str, int, str]]:
+        """Запросы, повторённые threshold и более раз с разными параметрами.
+
+        Возвращает (нормализованный SQL, число повторов, место вызова).
+        """
+        threshold = threshold or settings.SQL_N_PLUS_ONE_THRESHOLD
+        return [
+            (
+                normalize_sql(statement),
+                count,
+                self.call_sites.get(statement, "unknown"),
+            )
+            for statement, count in self.repeats.most_common()
+            if count >= threshold and len(self.parameters[statement]) > 1
+        ]
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar(
+    "sql_query_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, parameters)
+
+
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("sql_profiler_start", []).append(time.perf_counter())
+
+
+def _log_slow_query(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("sql_profiler_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        logger.warning(
+            "slow query %.1f ms at %s: %s",
+            elapsed * 1000,
+            call_site(),
+            normalize_sql(statement),
+        )
+
+
+def install(engine: Engine) -> None:
+    """Подключение профилировщика к движку.
+
+    Подсчёт запросов подключается всегда и работает только внутри
+    track_queries. Журнал медленных запросов — при SQL_PROFILER_ENABLED.
+    """
+    listeners = [("before_cursor_execute", _before_cursor_execute)]
+    if settings.SQL_PROFILER_ENABLED and settings.SQL_SLOW_QUERY_MS > 0:
+        listeners += [
+            ("before_cursor_execute", _start_timer),
+            ("after_cursor_execute", _log_slow_query),
+        ]
+    for name, listener in listeners:
+        if not event.contains(engine, name, listener):
+            event.listen(engine, name, listener)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Считает запросы, выполненные внутри блока (в том же контексте)."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def query_budget(max_queries: int):
+    """Зависимость FastAPI: бюджет SQL-запросов эндпоинта.
+
+    Превышение логируется профилировщиком, а бюджет отдаётся в заголовке
+    X-Query-Budget рядом с X-Query-Count, чтобы тесты могли его проверить.
+    """
+
+    async def set_query_budget() -> None:
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.budget = max_queries
+
+    return set_query_budget
+
+
+class SQLProfilerMiddleware:
+    """ASGI-middleware: SQL-запросы каждого HTTP-запроса.
+
+    Предупреждает о N+1 и превышении бюджета; с SQL_QUERY_COUNT_HEADER
+    добавляет заголовки X-Query-Count и X-Query-Budget.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_count(message) -> None:
+                if (
+                    message["type"] == "http.response.start"
+                    and settings.SQL_QUERY_COUNT_HEADER
+                ):
+                    headers = list(message.get("headers", []))
+                    headers.append(
+                        (QUERY_COUNT_HEADER.lower().encode(), str(stats.count).encode())
+                    )
+                    if stats.budget is not None:
+                        headers.append(
+                            (
+                                QUERY_BUDGET_HEADER.lower().encode(),
+                                str(stats.budget).encode(),
+                            )
+                        )
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
+
+        request = f"{scope['method']} {scope['path']}"
+        if stats.over_budget:
+            logger.warning(
+                "%s ran %d queries, budget %d", request, stats.count, stats.budget
+            )
+        for sql, count, site in stats.n_plus_one():
+            logger.warning(
+                "possible N+1 in %s: %d x at %s: %s", request, count, site, sql
+            )
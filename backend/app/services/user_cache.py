@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.core.config import settings
+from app.models.user import User
+from app.services.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Поля пользователя, которые нужны роутерам после аутентификации."""
+
+    id: int
+    email: str
+    is_active: bool
+    is_admin: bool
+    created_at: datetime | None
+
+    @classmethod
+    def from_model(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            is_active=bool(user.is_active),
+            is_admin=bool(user.is_admin),
+            created_at=user.created_at,
+        )
+
+
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_MAXSIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Сброс закэшированного пользователя после изменения в БД."""
+    user_cache.pop(user_id)
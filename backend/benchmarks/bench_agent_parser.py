@@ -0,0 +1,75 @@
+"""Разбор ответов агента: json.loads против parse_split_output.
+
+Корпус benchmarks/data/agent_outputs.jsonl — ответы модели в форматах,
+которые встречаются на практике: чистый JSON, markdown-ограждение, текст
+вокруг JSON, оборванная генерация, пустые и невалидные ответы.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import benchmarks.common  # noqa: F401  (настройки окружения до импорта app)
+
+from app.agents.parsing import AgentOutputError, parse_split_output
+
+CORPUS = Path(__file__).parent / "data" / "agent_outputs.jsonl"
+
+
+def naive(text: str) -> bool:
+    """Разбор до парсера: json.loads и обращение к полям подзадач."""
+    try:
+        result = json.loads(text)
+        return bool([(sub["title"], sub["description"]) for sub in result["subtasks"]])
+    except (ValueError, KeyError, TypeError):
+        return False
+
+
+def tolerant(text: str) -> bool:
+    try:
+        parse_split_output(text)
+        return True
+    except AgentOutputError:
+        return False
+
+
+def timed(parse, outputs: list[str], repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for text in outputs:
+            parse(text)
+    return (time.perf_counter() - start) / (repeats * len(outputs))
+
+
+def main(repeats: int) -> None:
+    corpus = [json.loads(line) for line in CORPUS.read_text().splitlines()]
+    outputs = [item["response"] for item in corpus]
+
+    print(f"{'output':<22} {'json.loads':>10} {'parser':>8}")
+    for item in corpus:
+        print(
+            f"{item['name']:<22} {'ok' if naive(item['response']) else '-':>10}"
+            f" {'ok' if tolerant(item['response']) else '-':>8}"
+        )
+
+    naive_ok = sum(naive(text) for text in outputs)
+    tolerant_ok = sum(tolerant(text) for text in outputs)
+    print(
+        f"\nusable outputs: json.loads {naive_ok}/{len(outputs)}, "
+        f"parser {tolerant_ok}/{len(outputs)}"
+    )
+    print(f"re-prompts avoided: {tolerant_ok - naive_ok}")
+    clean = [text for text in outputs if naive(text)]
+    for name, parse in (("json.loads", naive), ("parser", tolerant)):
+        print(
+            f"{name:<10} all {timed(parse, outputs, repeats) * 1e6:7.1f} us/output, "
+            f"clean {timed(parse, clean, repeats) * 1e6:7.1f} us/output"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.repeats)
@@ -0,0 +1,68 @@
+"""Пропускная способность чтения задач: синхронная сессия против AsyncSession.
+
+Обе ручки объявлены как ``async def``, как и роутеры приложения. Разница
+заметна на сетевой базе: ``DATABASE_URL=postgresql://... python -m ...``.
+"""
+
+import argparse
+
+from benchmarks.common import make_client, measure, report, run
+from fastapi import Depends, FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.crud.task import get_tasks_by_user_async
+from app.database import SessionLocal, get_async_db, get_db
+from app.models.task import Task
+from app.models.user import User
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/sync/tasks")
+async def sync_tasks(user_id: int, db: Session = Depends(get_db)) -> int:
+    tasks = db.scalars(
+        select(Task).where(Task.user_id == user_id).order_by(Task.id).limit(50)
+    )
+    return len(tasks.all())
+
+
+@bench_app.get("/async/tasks")
+async def async_tasks(user_id: int, db: AsyncSession = Depends(get_async_db)) -> int:
+    return len(await get_tasks_by_user_async(db, user_id=user_id, limit=50))
+
+
+def seed(tasks: int) -> int:
+    with SessionLocal() as db:
+        user = User(email=f"async_bench_{id(db)}@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        db.add_all(
+            Task(title=f"Task {i}", description="bench", user_id=user.id)
+            for i in range(tasks)
+        )
+        db.commit()
+        return user.id
+
+
+async def main(total: int, concurrency: int) -> None:
+    user_id = seed(200)
+    async with make_client(bench_app) as client:
+        for name in ("sync", "async"):
+
+            async def call(path: str = f"/{name}/tasks") -> None:
+                response = await client.get(path, params={"user_id": user_id})
+                response.raise_for_status()
+
+            await measure(call, total=50, concurrency=concurrency)
+            latencies, elapsed = await measure(call, total, concurrency)
+            report(f"{name} session", latencies, elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    run(main(args.requests, args.concurrency))
@@ -0,0 +1,78 @@
+"""Пакетные операции над задачами против N одиночных вызовов."""
+
+import argparse
+import time
+
+from benchmarks.common import make_client, register_user, run
+
+
+async def timed(call) -> float:
+    start = time.perf_counter()
+    await call()
+    return time.perf_counter() - start
+
+
+async def main(items: int) -> None:
+    async with make_client() as client:
+        headers = {"Authorization": f"Bearer {await register_user(client)}"}
+        payload = [{"title": f"Task {i}"} for i in range(items)]
+        ids: list[int] = []
+
+        async def create_single() -> None:
+            for item in payload:
+                response = await client.post("/tasks/", json=item, headers=headers)
+                ids.append(response.json()["id"])
+
+        async def create_bulk() -> None:
+            response = await client.post(
+                "/tasks/bulk", json={"items": payload}, headers=headers
+            )
+            ids.extend(result["id"] for result in response.json()["results"])
+
+        async def update_single() -> None:
+            for task_id in ids:
+                await client.put(
+                    f"/tasks/{task_id}", json={"status": "done"}, headers=headers
+                )
+
+        async def update_bulk() -> None:
+            await client.patch(
+                "/tasks/bulk",
+                json={"items": [{"id": task_id, "status": "done"} for task_id in ids]},
+                headers=headers,
+            )
+
+        async def delete_single() -> None:
+            for task_id in ids:
+                await client.delete(f"/tasks/{task_id}", headers=headers)
+            ids.clear()
+
+        async def delete_bulk() -> None:
+            await client.request(
+                "DELETE", "/tasks/bulk", json={"ids": ids}, headers=headers
+            )
+            ids.clear()
+
+        single = {
+            "create": await timed(create_single),
+            "update": await timed(update_single),
+            "delete": await timed(delete_single),
+        }
+        bulk = {
+            "create": await timed(create_bulk),
+            "update": await timed(update_bulk),
+            "delete": await timed(delete_bulk),
+        }
+        print(f"{'operation':<8} {'single, s':>10} {'bulk, s':>10} {'speedup':>8}")
+        for name in single:
+            print(
+                f"{name:<8} {single[name]:>10.3f} {bulk[name]:>10.3f}"
+                f" {single[name] / bulk[name]:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=500)
+    args = parser.parse_args()
+    run(main(args.items))
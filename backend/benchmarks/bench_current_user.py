@@ -0,0 +1,35 @@
+"""Задержка GET /tasks/ под конкурентной нагрузкой с кэшем пользователей и без."""
+
+import argparse
+
+from benchmarks.common import make_client, measure, register_user, report, run
+
+from app.services.user_cache import user_cache
+
+
+async def main(total: int, concurrency: int) -> None:
+    async with make_client() as client:
+        token = await register_user(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def call() -> None:
+            response = await client.get("/tasks/", headers=headers)
+            response.raise_for_status()
+
+        maxsize = user_cache.maxsize
+        for name, size in (("without user cache", 0), ("with user cache", maxsize)):
+            user_cache.clear()
+            user_cache.maxsize = size
+            await measure(call, total=50, concurrency=concurrency)
+            latencies, elapsed = await measure(call, total, concurrency)
+            report(name, latencies, elapsed)
+            print(f"{'':<32} cache stats: {user_cache.stats()}")
+        user_cache.maxsize = maxsize
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    run(main(args.requests, args.concurrency))
@@ -0,0 +1,61 @@
+"""Накладные расходы MetricsMiddleware на один запрос.
+
+Middleware вызывается напрямую вокруг пустого ASGI-приложения, которое
+сразу отвечает 200, так что разница во времени — цена самих метрик и
+заголовка Server-Timing, без роутинга и сети.
+"""
+
+import argparse
+import asyncio
+import time
+
+import benchmarks.common  # noqa: F401  (настройки окружения до импорта app)
+
+from app.services.http_metrics import MetricsMiddleware, RouteMetrics
+
+
+class Route:
+    path_format = "/{task_id}"
+
+
+async def endpoint(scope, receive, send) -> None:
+    scope["route"] = Route
+    scope["path_params"] = {"task_id": 42}
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive() -> dict:
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message) -> None:
+    pass
+
+
+async def timed(app, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        scope = {"type": "http", "method": "GET", "path": "/tasks/42"}
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / calls
+
+
+async def main(calls: int, rounds: int) -> None:
+    middleware = MetricsMiddleware(endpoint, metrics=RouteMetrics())
+    bare, wrapped = [], []
+    for _ in range(rounds):
+        bare.append(await timed(endpoint, calls))
+        wrapped.append(await timed(middleware, calls))
+    bare_us, wrapped_us = min(bare) * 1e6, min(wrapped) * 1e6
+    print(f"bare app          {bare_us:6.2f} us/request")
+    print(f"MetricsMiddleware {wrapped_us:6.2f} us/request")
+    print(f"overhead          {wrapped_us - bare_us:6.2f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.rounds))
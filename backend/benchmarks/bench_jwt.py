@@ -0,0 +1,49 @@
+"""Цена аутентификации: decode_jwt с кэшем проверенных claims и без него.
+
+Сначала microbenchmark самого decode_jwt, затем GET /users/me, где на
+каждом запросе проверяется access-токен.
+"""
+
+import argparse
+import time
+
+from benchmarks.common import make_client, measure, register_user, report, run
+
+from app.core.security import decode_jwt, jwt_claims_cache
+
+
+def timed_decode(token: str, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        decode_jwt(token)
+    return (time.perf_counter() - start) / repeats
+
+
+async def main(repeats: int, total: int, concurrency: int) -> None:
+    maxsize = jwt_claims_cache.maxsize
+    async with make_client() as client:
+        token = await register_user(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def read_me() -> None:
+            response = await client.get("/users/me", headers=headers)
+            response.raise_for_status()
+
+        for name, size in (("no claims cache", 0), ("claims cache", maxsize)):
+            jwt_claims_cache.maxsize = size
+            jwt_claims_cache.clear()
+            print(
+                f"decode_jwt, {name:<16} {timed_decode(token, repeats) * 1e6:7.1f} us"
+            )
+            latencies, elapsed = await measure(read_me, total, concurrency)
+            report(f"GET /users/me, {name}", latencies, elapsed)
+    jwt_claims_cache.maxsize = maxsize
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    run(main(args.repeats, args.requests, args.concurrency))
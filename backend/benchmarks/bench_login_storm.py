@@ -0,0 +1,53 @@
+"""Влияние шторма логинов на задержку GET /tasks/.
+
+Сравнивает хеширование паролей прямо в event loop (PASSWORD_HASH_WORKERS=0)
+и в отдельном пуле потоков.
+"""
+
+import argparse
+import asyncio
+import uuid
+
+from benchmarks.common import make_client, measure, register_user, report, run
+
+from app.core.security import password_hasher
+
+
+async def main(total: int, logins: int, concurrency: int) -> None:
+    async with make_client() as client:
+        token = await register_user(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        email = f"storm_{uuid.uuid4().hex[:12]}@example.com"
+        await client.post("/users/", json={"email": email, "password": "1234"})
+
+        async def read_tasks() -> None:
+            response = await client.get("/tasks/", headers=headers)
+            response.raise_for_status()
+
+        async def login() -> None:
+            await client.post(
+                "/auth/login", data={"username": email, "password": "1234"}
+            )
+
+        latencies, elapsed = await measure(read_tasks, total, concurrency)
+        report("GET /tasks/ idle", latencies, elapsed)
+
+        workers = password_hasher.max_workers
+        for name, size in (("inline hashing", 0), ("hashing pool", workers)):
+            password_hasher.max_workers = size
+            storm = asyncio.create_task(measure(login, logins, concurrency))
+            latencies, elapsed = await measure(read_tasks, total, concurrency)
+            report(f"GET /tasks/ + logins, {name}", latencies, elapsed)
+            login_latencies, login_elapsed = await storm
+            report(f"POST /auth/login, {name}", login_latencies, login_elapsed)
+        password_hasher.max_workers = workers
+        password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    run(main(args.requests, args.logins, args.concurrency))
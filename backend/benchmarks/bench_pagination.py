@@ -0,0 +1,65 @@
+"""Глубокие страницы списка задач: OFFSET против keyset-курсора."""
+
+import argparse
+import time
+
+from benchmarks.common import run
+from sqlalchemy import insert
+
+from app.crud.task import get_tasks_by_user_async
+from app.database import AsyncSessionLocal, SessionLocal
+from app.models.task import Task
+from app.models.user import User
+
+
+def seed(tasks: int, chunk: int = 50_000) -> int:
+    with SessionLocal() as db:
+        user = User(email=f"pagination_{time.time_ns()}@example.com")
+        db.add(user)
+        db.flush()
+        for start in range(0, tasks, chunk):
+            db.execute(
+                insert(Task),
+                [
+                    {"title": f"Task {i}", "status": "pending", "user_id": user.id}
+                    for i in range(start, min(start + chunk, tasks))
+                ],
+            )
+        db.commit()
+        return user.id
+
+
+async def timed(repeats: int, **kwargs) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            await get_tasks_by_user_async(db, **kwargs)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def main(tasks: int, limit: int, repeats: int) -> None:
+    started = time.perf_counter()
+    user_id = seed(tasks)
+    print(f"seeded {tasks} tasks in {time.perf_counter() - started:.1f}s")
+    async with AsyncSessionLocal() as db:
+        first_id = (await get_tasks_by_user_async(db, user_id=user_id, limit=1))[0].id
+    for depth in (0, tasks // 100, tasks // 10, tasks // 2, tasks - limit):
+        offset = await timed(repeats, user_id=user_id, skip=depth, limit=limit)
+        keyset = await timed(
+            repeats, user_id=user_id, after_id=first_id + depth - 1, limit=limit
+        )
+        print(
+            f"depth={depth:<9} offset={offset * 1000:8.2f}ms "
+            f"keyset={keyset * 1000:8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    run(main(args.tasks, args.limit, args.repeats))
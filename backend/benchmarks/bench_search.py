@@ -0,0 +1,93 @@
+"""Поиск по задачам: полнотекстовый индекс против сканирования LIKE."""
+
+import argparse
+import random
+import time
+
+from benchmarks.common import run
+from sqlalchemy import insert, or_, select
+
+from app.crud.task import search_tasks_async
+from app.database import AsyncSessionLocal, SessionLocal
+from app.models.task import Task
+from app.models.user import User
+
+WORDS = [f"слово{i:04}" for i in range(5000)]
+RARE_WORD = "редкость"
+
+
+def seed(tasks: int, chunk: int = 50_000) -> int:
+    rng = random.Random(0)
+    with SessionLocal() as db:
+        user = User(email=f"search_{time.time_ns()}@example.com")
+        db.add(user)
+        db.flush()
+        for start in range(0, tasks, chunk):
+            db.execute(
+                insert(Task),
+                [
+                    {
+                        "title": " ".join(rng.choices(WORDS, k=3)),
+                        "description": " ".join(rng.choices(WORDS, k=12))
+                        + (f" {RARE_WORD}" if i % 100_000 == 0 else ""),
+                        "status": "pending",
+                        "user_id": user.id,
+                    }
+                    for i in range(start, min(start + chunk, tasks))
+                ],
+            )
+        db.commit()
+        return user.id
+
+
+async def like_scan(db, user_id: int, word: str, limit: int) -> list[Task]:
+    pattern = f"%{word}%"
+    result = await db.scalars(
+        select(Task)
+        .where(
+            Task.user_id == user_id,
+            or_(Task.title.ilike(pattern), Task.description.ilike(pattern)),
+        )
+        .order_by(Task.id)
+        .limit(limit)
+    )
+    return list(result)
+
+
+async def timed(repeats: int, call) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(repeats):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            found = await call(db)
+            best = min(best, time.perf_counter() - start)
+    return best, len(found)
+
+
+async def main(tasks: int, limit: int, repeats: int) -> None:
+    started = time.perf_counter()
+    user_id = seed(tasks)
+    print(f"seeded {tasks} tasks in {time.perf_counter() - started:.1f}s")
+    for word in (WORDS[42], RARE_WORD, "отсутствует"):
+        like, like_found = await timed(
+            repeats, lambda db, word=word: like_scan(db, user_id, word, limit)
+        )
+        fts, fts_found = await timed(
+            repeats,
+            lambda db, word=word: search_tasks_async(
+                db, user_id=user_id, query=word, limit=limit
+            ),
+        )
+        print(
+            f"{word:<12} like={like * 1000:9.2f}ms ({like_found:>3}) "
+            f"fts={fts * 1000:9.2f}ms ({fts_found:>3})"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    run(main(args.tasks, args.limit, args.repeats))
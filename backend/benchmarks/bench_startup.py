@@ -0,0 +1,119 @@
+"""Холодный старт: время импорта app.main и до первого ответа.
+
+Каждый замер — отдельный процесс Python на новой SQLite-базе, с lifespan
+приложения. С --max-import-ms / --max-first-response-ms скрипт завершается
+с кодом 1, если медиана хуже бюджета (для проверки в CI).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+CHILD = """
+import asyncio, json, time
+import httpx
+
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def first_response():
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://x") as c:
+            status = (await c.get("/tasks/")).status_code
+        return status, time.perf_counter()
+
+status, responded = asyncio.run(first_response())
+print(json.dumps({
+    "import": imported - start, "first_response": responded - start, "status": status,
+}))
+"""
+
+
+def child_env(tmp: str) -> dict[str, str]:
+    return {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp}/startup.db",
+        "SECRET_KEY": "bench-secret-key",
+        "AGENT_HEALTH_CHECK_INTERVAL": "0",
+    }
+
+
+def measure_once() -> dict[str, float]:
+    with tempfile.TemporaryDirectory(prefix="devteam-startup-") as tmp:
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD],
+            cwd=BACKEND_DIR,
+            env=child_env(tmp),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        result = json.loads(output)
+        result["process"] = time.perf_counter() - started
+        return result
+
+
+def import_profile(top: int) -> list[tuple[int, str]]:
+    """Самые тяжёлые модули по `python -X importtime` (накопительно, мкс)."""
+    with tempfile.TemporaryDirectory(prefix="devteam-startup-") as tmp:
+        stderr = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import app.main"],
+            cwd=BACKEND_DIR,
+            env=child_env(tmp),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Отступ имени — глубина вложенности: app.main и его прямые импорты.
+        depth = (len(name) - len(name.lstrip())) // 2
+        if cumulative.strip().isdigit() and depth <= 1:
+            modules.append((int(cumulative), name.strip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def main(runs: int, top: int, max_import: float, max_first_response: float) -> int:
+    results = [measure_once() for _ in range(runs)]
+    assert all(r["status"] == 401 for r in results)
+    medians = {
+        key: statistics.median(r[key] for r in results) * 1000
+        for key in ("import", "first_response", "process")
+    }
+    print(f"runs={runs}")
+    for key, value in medians.items():
+        print(f"{key:<16} median={value:8.1f}ms")
+    print("\nheaviest top-level imports (cumulative):")
+    for cumulative, name in import_profile(top):
+        print(f"  {cumulative / 1000:8.1f}ms  {name}")
+
+    failed = False
+    for key, budget in (("import", max_import), ("first_response", max_first_response)):
+        if budget and medians[key] > budget:
+            print(f"\n{key} {medians[key]:.1f}ms exceeds budget {budget:.1f}ms")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-import-ms", type=float, default=0)
+    parser.add_argument("--max-first-response-ms", type=float, default=0)
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.top, args.max_import_ms, args.max_first_response_ms))
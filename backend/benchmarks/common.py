@@ -0,0 +1,94 @@
+"""Общий стенд для бенчмарков: временная SQLite-база и ASGI-клиент.
+
+Запуск из каталога backend: ``python -m benchmarks.<имя_скрипта>``.
+"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Coroutine
+from typing import Any
+
+_BENCH_DIR = tempfile.mkdtemp(prefix="devteam-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_BENCH_DIR}/bench.db")
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.database import Base, async_engine, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+Base.metadata.create_all(bind=engine)
+
+
+def run(main: Coroutine[Any, Any, None]) -> None:
+    """Запуск сценария с закрытием соединений асинхронного движка в конце."""
+
+    async def wrapper() -> None:
+        try:
+            await main
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(wrapper())
+
+
+def make_client(target: FastAPI = app) -> httpx.AsyncClient:
+    """HTTP-клиент, который ходит в приложение напрямую через ASGI."""
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=target), base_url="http://bench"
+    )
+
+
+async def register_user(client: httpx.AsyncClient, password: str = "1234") -> str:
+    """Регистрирует пользователя и возвращает access-токен."""
+    email = f"bench_{uuid.uuid4().hex[:12]}@example.com"
+    await client.post("/users/", json={"email": email, "password": password})
+    response = await client.post(
+        "/auth/login", data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def measure(
+    call: Callable[[], Awaitable[object]], total: int, concurrency: int
+) -> tuple[list[float], float]:
+    """Выполняет total вызовов с заданной конкурентностью.
+
+    Возвращает задержки каждого вызова в секундах и общее время.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return latencies, time.perf_counter() - started
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Перцентиль по отсортированной выборке."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def report(name: str, latencies: list[float], elapsed: float) -> None:
+    """Печать p50/p99 и пропускной способности."""
+    print(
+        f"{name:<32} n={len(latencies):<6} "
+        f"p50={percentile(latencies, 50) * 1000:8.2f}ms "
+        f"p99={percentile(latencies, 99) * 1000:8.2f}ms "
+        f"mean={statistics.fmean(latencies) * 1000:8.2f}ms "
+        f"rps={len(latencies) / elapsed:9.1f}"
+    )
@@ -0,0 +1,28 @@
+"""Индексы для выборок задач по владельцу и родителю.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_tasks_user_id_id", "tasks", ["user_id", "id"])
+    op.create_index("ix_tasks_parent_task_id", "tasks", ["parent_task_id"])
+    op.create_index("ix_subtasks_task_id", "subtasks", ["task_id"])
+    op.create_index("ix_refresh_tokens_user_id", "refresh_tokens", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_refresh_tokens_user_id", table_name="refresh_tokens")
+    op.drop_index("ix_subtasks_task_id", table_name="subtasks")
+    op.drop_index("ix_tasks_parent_task_id", table_name="tasks")
+    op.drop_index("ix_tasks_user_id_id", table_name="tasks")
@@ -0,0 +1,40 @@
+"""ON DELETE для ссылок на tasks: подзадачи удаляются, дочерние задачи отвязываются.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# Внешние ключи в 0001 созданы без имён; в SQLite batch-режим находит их
+# по этому соглашению, в Postgres действуют имена по умолчанию.
+SQLITE_NAMING = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _replace_fk(table: str, column: str, ondelete: str | None) -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        name = f"fk_{table}_{column}_tasks"
+        with op.batch_alter_table(table, naming_convention=SQLITE_NAMING) as batch:
+            batch.drop_constraint(name, type_="foreignkey")
+            batch.create_foreign_key(name, "tasks", [column], ["id"], ondelete=ondelete)
+        return
+    name = f"{table}_{column}_fkey"
+    op.drop_constraint(name, table, type_="foreignkey")
+    op.create_foreign_key(name, table, "tasks", [column], ["id"], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    _replace_fk("subtasks", "task_id", "CASCADE")
+    _replace_fk("tasks", "parent_task_id", "SET NULL")
+
+
+def downgrade() -> None:
+    _replace_fk("tasks", "parent_task_id", None)
+    _replace_fk("subtasks", "task_id", None)
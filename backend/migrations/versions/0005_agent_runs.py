@@ -0,0 +1,54 @@
+"""Учёт вызовов LLM-агентов agent_runs.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "agent_runs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("agent", sa.String(), nullable=False),
+        sa.Column("model", sa.String(), nullable=True),
+        sa.Column("backend_url", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("queue_seconds", sa.Float(), nullable=False),
+        sa.Column("total_seconds", sa.Float(), nullable=False),
+        sa.Column("load_seconds", sa.Float(), nullable=False),
+        sa.Column("prompt_eval_count", sa.Integer(), nullable=False),
+        sa.Column("prompt_eval_seconds", sa.Float(), nullable=False),
+        sa.Column("eval_count", sa.Integer(), nullable=False),
+        sa.Column("eval_seconds", sa.Float(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(["task_id"], ["tasks.id"], ondelete="SET NULL"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_agent_runs_task_id", "agent_runs", ["task_id"])
+    op.create_index("ix_agent_runs_created_at", "agent_runs", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_agent_runs_created_at", table_name="agent_runs")
+    op.drop_index("ix_agent_runs_task_id", table_name="agent_runs")
+    op.drop_table("agent_runs")
@@ -0,0 +1,72 @@
+"""refresh_tokens.token → token_hash: SHA-256 вместо самого токена.
+
+Существующие строки пересчитываются в Python (одинаково для SQLite и
+Postgres), после чего исходный столбец удаляется. Откат восстановить
+токены не может, поэтому очищает таблицу: пользователи войдут заново.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+"""
+
+import hashlib
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+refresh_tokens = sa.table(
+    "refresh_tokens",
+    sa.column("id", sa.Integer()),
+    sa.column("token", sa.String()),
+    sa.column("token_hash", sa.CHAR(64)),
+)
+
+
+def _backfill_hashes() -> None:
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(refresh_tokens.c.id, refresh_tokens.c.token)
+            .where(refresh_tokens.c.id > last_id)
+            .order_by(refresh_tokens.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        bind.execute(
+            refresh_tokens.update()
+            .where(refresh_tokens.c.id == sa.bindparam("row_id"))
+            .values(token_hash=sa.bindparam("digest")),
+            [
+                {"row_id": id_, "digest": hashlib.sha256(token.encode()).hexdigest()}
+                for id_, token in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column("refresh_tokens", sa.Column("token_hash", sa.CHAR(64)))
+    _backfill_hashes()
+    with op.batch_alter_table("refresh_tokens") as batch:
+        batch.alter_column("token_hash", existing_type=sa.CHAR(64), nullable=False)
+        batch.drop_column("token")
+        batch.create_index("ix_refresh_tokens_token_hash", ["token_hash"], unique=True)
+
+
+def downgrade() -> None:
+    op.execute(refresh_tokens.delete())
+    with op.batch_alter_table("refresh_tokens") as batch:
+        batch.drop_index("ix_refresh_tokens_token_hash")
+        batch.drop_column("token_hash")
+        batch.add_column(sa.Column("token", sa.String(), nullable=False))
+        batch.create_unique_constraint("uq_refresh_tokens_token", ["token"])
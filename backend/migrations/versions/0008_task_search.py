@@ -0,0 +1,66 @@
+"""Полнотекстовый поиск по задачам и подзадачам.
+
+SQLite: таблицы FTS5 tasks_fts/subtasks_fts с триггерами и заполнением
+из существующих строк ('rebuild'). Postgres: GIN-индексы по to_tsvector.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00
+
+"""
+
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+TABLES = ("tasks", "subtasks")
+
+
+def _sqlite_upgrade(table: str) -> None:
+    fts = f"{table}_fts"
+    new = (
+        f"INSERT INTO {fts}(rowid, title, description) "
+        "VALUES (new.id, new.title, new.description);"
+    )
+    old = (
+        f"INSERT INTO {fts}({fts}, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description);"
+    )
+    op.execute(
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"title, description, content='{table}', content_rowid='id')"
+    )
+    op.execute(f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {new} END")
+    op.execute(f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {old} END")
+    op.execute(
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF title, description ON {table} "
+        f"BEGIN {old} {new} END"
+    )
+    op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table in TABLES:
+        if dialect == "sqlite":
+            _sqlite_upgrade(table)
+        elif dialect == "postgresql":
+            op.execute(
+                f"CREATE INDEX ix_{table}_search ON {table} USING gin ("
+                f"to_tsvector('simple', coalesce({table}.title, '') || ' ' || "
+                f"coalesce({table}.description, '')))"
+            )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table in TABLES:
+        if dialect == "sqlite":
+            for suffix in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER {table}_fts_{suffix}")
+            op.execute(f"DROP TABLE {table}_fts")
+        elif dialect == "postgresql":
+            op.execute(f"DROP INDEX ix_{table}_search")
@@ -0,0 +1,44 @@
+"""ON DELETE CASCADE для refresh_tokens.user_id: токены уходят вместе с пользователем.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00
+
+"""
+
+from alembic import op
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+# Внешний ключ в 0001 создан без имени; в SQLite batch-режим находит его
+# по этому соглашению, в Postgres действует имя по умолчанию.
+SQLITE_NAMING = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _replace_fk(ondelete: str | None) -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        name = "fk_refresh_tokens_user_id_users"
+        with op.batch_alter_table(
+            "refresh_tokens", naming_convention=SQLITE_NAMING
+        ) as batch:
+            batch.drop_constraint(name, type_="foreignkey")
+            batch.create_foreign_key(
+                name, "users", ["user_id"], ["id"], ondelete=ondelete
+            )
+        return
+    name = "refresh_tokens_user_id_fkey"
+    op.drop_constraint(name, "refresh_tokens", type_="foreignkey")
+    op.create_foreign_key(
+        name, "refresh_tokens", "users", ["user_id"], ["id"], ondelete=ondelete
+    )
+
+
+def upgrade() -> None:
+    _replace_fk("CASCADE")
+
+
+def downgrade() -> None:
+    _replace_fk(None)
@@ -8,36 +8,42 @@ from pathlib import Path
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from pydantic_settings import BaseSettings
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-for-tests-only")
 
+from app.core import config
 
-class TestSettings(BaseSettings):
-    DATABASE_URL: str = "sqlite:///./test.db"
-    SECRET_KEY: str = "test-secret-key-for-tests-only"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+config.settings = config.TestSettings()
 
-
-import types
-
-test_config_module = types.ModuleType("app.core.config")
-test_config_module.Settings = TestSettings
-test_config_module.settings = TestSettings()
-
-sys.modules["app.core.config"] = test_config_module
-
-from app.database import Base, get_db
+from app.agents.backends import agent_backends
+from app.agents.cache import agent_cache
+from app.database import Base, configure_engine, get_async_db, get_db
+from app.core.security import jwt_claims_cache
 from app.main import app
+from app.services.agent_runs import agent_run_recorder
+from app.services.maintenance import MaintenanceSweeper
+from app.services.split_jobs import SplitJobWorkers
+from app.services.user_cache import user_cache
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
+configure_engine(engine)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# TestClient поднимает свой event loop на каждый запрос, поэтому без пула.
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+configure_engine(async_engine.sync_engine)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
 
 Base.metadata.create_all(bind=engine)
 
@@ -50,7 +56,14 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+agent_run_recorder.session_factory = TestingAsyncSessionLocal
 
 
 @pytest.fixture(scope="function")
@@ -63,22 +76,130 @@ def test_user():
     return {"email": f"test_{uuid.uuid4()}@example.com", "password": "1234"}
 
 
-@pytest.fixture(scope="function")
-def auth_token(client, test_user):
-    client.post("/users/", json=test_user)
+def login(client, user: dict) -> str:
+    """Вход через API; access-токен."""
     response = client.post(
         "/auth/login",
-        data={"username": test_user["email"], "password": test_user["password"]},
+        data={"username": user["email"], "password": user["password"]},
     )
     return response.json()["access_token"]
 
 
+@pytest.fixture(scope="function")
+def auth_token(client, test_user):
+    client.post("/users/", json=test_user)
+    return login(client, test_user)
+
+
+@pytest.fixture(scope="function")
+def auth_headers(auth_token):
+    """Заголовок авторизации основного тестового пользователя."""
+    return {"Authorization": f"Bearer {auth_token}"}
+
+
+@pytest.fixture(scope="function")
+def other_headers(client):
+    """Заголовок авторизации второго пользователя для проверок чужого доступа."""
+    other = {"email": f"other_{uuid.uuid4()}@example.com", "password": "1234"}
+    client.post("/users/", json=other)
+    return {"Authorization": f"Bearer {login(client, other)}"}
+
+
+@pytest.fixture(scope="function")
+def create_task(client, auth_headers):
+    """Создание задачи основного пользователя через API; возвращает id."""
+
+    def create(title: str = "Задача", **fields) -> int:
+        response = client.post(
+            "/tasks/", json={"title": title, **fields}, headers=auth_headers
+        )
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+
+    return create
+
+
+@pytest.fixture(scope="function")
+def db():
+    """Синхронная сессия к тестовой базе для подготовки данных."""
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="function")
+def sql_statements():
+    """SQL, выполненный через асинхронный движок за время теста."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+
+@pytest.fixture(scope="function")
+def open_connections():
+    """Число соединений асинхронного движка, занятых в данный момент."""
+    count = 0
+
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        nonlocal count
+        count += 1
+
+    def checkin(dbapi_connection, connection_record):
+        nonlocal count
+        count -= 1
+
+    pool = async_engine.sync_engine.pool
+    event.listen(pool, "checkout", checkout)
+    event.listen(pool, "checkin", checkin)
+    yield lambda: count
+    event.remove(pool, "checkout", checkout)
+    event.remove(pool, "checkin", checkin)
+
+
+@pytest.fixture(scope="function")
+def split_worker():
+    """Воркер очереди разбивок на тестовой БД (lifespan в тестах не запускается)."""
+    return SplitJobWorkers(session_factory=TestingAsyncSessionLocal)
+
+
+@pytest.fixture(scope="function")
+def sweeper():
+    """Очистка БД на тестовой базе (lifespan в тестах не запускается)."""
+    return MaintenanceSweeper(session_factory=TestingAsyncSessionLocal)
+
+
+@pytest.fixture(scope="function")
+def admin_token(client):
+    admin = {"email": f"admin_{uuid.uuid4()}@example.com", "password": "1234"}
+    client.post("/users/", json=admin)
+    db = TestingSessionLocal()
+    db.execute(
+        text("UPDATE users SET is_admin = 1 WHERE email = :email"),
+        {"email": admin["email"]},
+    )
+    db.commit()
+    db.close()
+    return login(client, admin)
+
+
 @pytest.fixture(scope="function", autouse=True)
 def clean_db():
     """Очищает БД перед каждым тестом."""
     db = TestingSessionLocal()
     db.execute(text("DELETE FROM refresh_tokens;"))
+    db.execute(text("DELETE FROM split_jobs;"))
+    db.execute(text("DELETE FROM agent_runs;"))
+    db.execute(text("DELETE FROM subtasks;"))
     db.execute(text("DELETE FROM tasks;"))
     db.execute(text("DELETE FROM users;"))
     db.commit()
     db.close()
+    user_cache.clear()
+    jwt_claims_cache.clear()
+    agent_cache.clear()
+    agent_backends.reset()
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.agents.backends import BackendRegistry, BackendUnavailableError
+from app.agents.http import AgentHTTPClient
+from app.core.config import OllamaBackend
+
+
+class StubOllama(ThreadingHTTPServer):
+    """Заглушка Ollama: отвечает своим именем или 500, если сломана."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.name = name
+        self.broken = False
+        self.requests: list[tuple[str, dict]] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.reply(500 if self.server.broken else 200, {"models": []})
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.path, payload))
+        if self.server.broken:
+            self.reply(500, {"error": "broken"})
+        else:
+            self.reply(200, {"response": self.server.name})
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stubs():
+    servers = [StubOllama("a"), StubOllama("b")]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield servers
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def make_registry(stubs, threshold=2, cooldown=60.0) -> BackendRegistry:
+    return BackendRegistry(
+        [
+            OllamaBackend(url=stubs[0].url, model="model-a"),
+            OllamaBackend(url=stubs[1].url, model="model-b"),
+        ],
+        failure_threshold=threshold,
+        cooldown=cooldown,
+        http=AgentHTTPClient(),
+    )
+
+
+def served_by(registry: BackendRegistry, count: int = 1) -> list[str]:
+    async def scenario():
+        names = []
+        for _ in range(count):
+            _, response = await registry.post("/api/generate", {"prompt": "p"})
+            names.append(response.json()["response"])
+        await registry.http.aclose()
+        return names
+
+    return asyncio.run(scenario())
+
+
+def test_least_outstanding_with_rotation(stubs):
+    registry = make_registry(stubs)
+    a, b = registry.backends
+    assert [served_by(registry)[0] for _ in range(4)] == ["a", "b", "a", "b"]
+    a.outstanding = 3
+    assert registry.pick() is b
+    assert stubs[0].requests[0] == (
+        "/api/generate",
+        {"prompt": "p", "model": "model-a"},
+    )
+    assert stubs[1].requests[0][1]["model"] == "model-b"
+
+
+def test_failover_and_circuit_breaker(stubs):
+    """Сломанный сервер обходится, после порога ошибок выводится из ротации."""
+    stubs[0].broken = True
+    registry = make_registry(stubs, threshold=2)
+    a, _ = registry.backends
+    assert served_by(registry, 4) == ["b"] * 4
+    assert a.state == "open"
+    assert a.errors == 2
+    assert len(stubs[0].requests) == 2
+
+
+def test_half_open_backend_recovers(stubs):
+    stubs[0].broken = True
+    registry = make_registry(stubs, threshold=1, cooldown=0.05)
+    a, _ = registry.backends
+    served_by(registry)
+    assert a.state == "open"
+    stubs[0].broken = False
+    time.sleep(0.06)
+    assert a.state == "half_open"
+    registry.backends[1].last_used = 10**9
+    assert served_by(registry) == ["a"]
+    assert a.state == "closed"
+
+
+def test_all_backends_down(stubs):
+    for stub in stubs:
+        stub.broken = True
+    registry = make_registry(stubs, threshold=1)
+    with pytest.raises(BackendUnavailableError):
+        served_by(registry)
+    assert [b.state for b in registry.backends] == ["open", "open"]
+
+
+def test_health_check_opens_and_closes_circuit(stubs):
+    registry = make_registry(stubs)
+    a, b = registry.backends
+    stubs[0].broken = True
+    asyncio.run(registry.check_health())
+    assert (a.state, b.state) == ("open", "closed")
+    stubs[0].broken = False
+    asyncio.run(registry.check_health())
+    assert a.state == "closed"
+
+
+def test_streaming_fails_over_before_response(stubs):
+    stubs[0].broken = True
+    registry = make_registry(stubs)
+
+    async def scenario():
+        async with registry.stream("/api/generate", {"prompt": "p"}) as (
+            backend,
+            response,
+        ):
+            body = json.loads(await response.aread())
+        await registry.http.aclose()
+        return backend, body
+
+    backend, body = asyncio.run(scenario())
+    assert backend.model == "model-b"
+    assert body == {"response": "b"}
+    assert registry.backends[0].outstanding == backend.outstanding == 0
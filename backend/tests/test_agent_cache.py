@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.agents import project_manager
+from app.agents.backends import BackendUnavailableError
+from app.agents.cache import agent_cache, make_cache_key
+from app.agents.http import AgentHTTPClient
+from app.services.cache import SQLiteCache
+
+
+def test_cache_key_ignores_case_and_whitespace():
+    params = {"format": "json"}
+    key = make_cache_key("Сделать  API\n для задач", "gemma3:1b", params)
+    assert key == make_cache_key("сделать api для задач ", "gemma3:1b", params)
+    assert key != make_cache_key("сделать api для задач", "llama3", params)
+    assert key != make_cache_key("сделать api для задач", "gemma3:1b", {})
+
+
+def test_sqlite_cache_lru_ttl_and_persistence(tmp_path):
+    """SQLite-кэш вытесняет давно не читанные записи и переживает переоткрытие."""
+    path = str(tmp_path / "cache.db")
+    cache = SQLiteCache(path, maxsize=2, ttl=60)
+    cache.set("a", {"n": 1})
+    cache.set("b", {"n": 2})
+    cache.get("a")
+    cache.set("c", {"n": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1}
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 2, "misses": 1}
+    cache.close()
+
+    reopened = SQLiteCache(path, maxsize=2, ttl=60)
+    assert reopened.get("c") == {"n": 3}
+    reopened.set("d", [1], ttl=0.01)
+    time.sleep(0.02)
+    assert reopened.get("d") is None
+    reopened.close()
+
+
+def mock_ollama(monkeypatch, handler):
+    calls = []
+
+    def transport_handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return handler(request)
+
+    monkeypatch.setattr(
+        project_manager.agent_backends,
+        "http",
+        AgentHTTPClient(transport=httpx.MockTransport(transport_handler)),
+    )
+    return calls
+
+
+def test_agent_reuses_cached_split(monkeypatch):
+    """Повторная разбивка той же задачи не обращается к LLM."""
+    calls = mock_ollama(
+        monkeypatch,
+        lambda request: httpx.Response(
+            200, json={"response": '{"subtasks": [{"id": 1, "title": "T"}]}'}
+        ),
+    )
+    first = asyncio.run(project_manager.project_manager_agent("Написать тесты"))
+    second = asyncio.run(project_manager.project_manager_agent("написать  тесты"))
+    assert first == second
+    assert first["subtasks"] == [{"id": 1, "title": "T", "description": ""}]
+    assert len(calls) == 1
+    assert agent_cache.stats()["hits"] == 1
+
+
+def test_agent_does_not_cache_failures(monkeypatch):
+    calls = mock_ollama(monkeypatch, lambda request: httpx.Response(500))
+    for _ in range(2):
+        with pytest.raises(BackendUnavailableError):
+            asyncio.run(project_manager.project_manager_agent("Упасть"))
+    assert len(calls) == 2
+    assert len(agent_cache) == 0
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.agents.http import AgentHTTPClient
+from app.core.config import settings
+
+
+class OllamaStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = b'{"response": "{}"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def ollama_url(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OllamaStub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(settings, "OLLAMA_BASE_URL", url)
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+def test_keepalive_connection_is_reused(ollama_url):
+    """Последовательные запросы идут по одному TCP-соединению."""
+    client = AgentHTTPClient()
+
+    async def scenario():
+        await client.start()
+        for _ in range(3):
+            response = await client.post("/api/generate", json={})
+            assert response.json() == {"response": "{}"}
+        await client.aclose()
+
+    asyncio.run(scenario())
+    stats = client.stats()
+    assert stats["requests"] == 3
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 2
+    assert stats["in_flight"] == 0
+
+
+def test_client_is_recreated_for_new_event_loop(ollama_url):
+    """Без lifespan клиент создаётся лениво, в том числе в новом цикле."""
+    client = AgentHTTPClient()
+    for _ in range(2):
+        asyncio.run(client.post("/api/generate", json={}))
+    assert client.stats()["connections_opened"] == 2
+
+
+def test_previous_loop_client_is_closed(ollama_url):
+    """Пул закрывается вместе со своим циклом, а не копится при смене цикла."""
+    client = AgentHTTPClient()
+    asyncio.run(client.post("/api/generate", json={}))
+    assert client._client.is_closed
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(
+        client.post("/api/generate", json={}), loop
+    ).result(5)
+    in_thread = client._client
+    asyncio.run(client.post("/api/generate", json={}))
+    for _ in range(100):
+        if in_thread.is_closed:
+            break
+        time.sleep(0.01)
+    assert in_thread.is_closed
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
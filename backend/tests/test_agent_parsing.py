@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.agents import project_manager
+from app.agents.http import AgentHTTPClient
+from app.agents.parsing import AgentOutputError, parse_split_output
+
+VALID = {
+    "reasoning_log": ["Шаг 1: схема"],
+    "subtasks": [
+        {"id": 1, "title": "Схема", "description": "Таблицы"},
+        {"id": 2, "title": "API", "description": "Роуты"},
+    ],
+}
+TEXT = json.dumps(VALID, ensure_ascii=False)
+
+
+@pytest.mark.parametrize(
+    "output",
+    [
+        TEXT,
+        f"```json\n{TEXT}\n```",
+        f"Вот разбивка задачи:\n{TEXT}\nУдачи!",
+        f"{TEXT}\n\nПояснение: {{не json}}",
+    ],
+    ids=["clean", "fenced", "prose", "trailing-braces"],
+)
+def test_repairs_wrapped_output(output):
+    assert parse_split_output(output).model_dump() == VALID
+
+
+def test_truncated_output_keeps_complete_subtasks():
+    truncated = TEXT[: TEXT.index('"API"') + 3]
+    result = parse_split_output(truncated)
+    assert [sub.title for sub in result.subtasks] == ["Схема"]
+    assert result.reasoning_log == VALID["reasoning_log"]
+
+
+@pytest.mark.parametrize(
+    "output",
+    [
+        "Не могу помочь",
+        '{"reasoning_log": ["a"], "subtasks": []}',
+        '{"subtasks": [{"description": "без названия"}]}',
+        '{"reasoning_log": ["оборвано',
+        'x {"a\\q": 1',
+    ],
+)
+def test_rejects_unusable_output(output):
+    with pytest.raises(AgentOutputError):
+        parse_split_output(output)
+
+
+def mock_outputs(monkeypatch, outputs):
+    prompts = []
+
+    def handler(request):
+        prompts.append(json.loads(request.content)["prompt"])
+        return httpx.Response(200, json={"response": outputs[len(prompts) - 1]})
+
+    monkeypatch.setattr(
+        project_manager.agent_backends,
+        "http",
+        AgentHTTPClient(transport=httpx.MockTransport(handler)),
+    )
+    return prompts
+
+
+def test_agent_reprompts_after_invalid_output(monkeypatch):
+    prompts = mock_outputs(monkeypatch, ['{"subtasks": []}', TEXT])
+    result = asyncio.run(project_manager.project_manager_agent("Сделать API"))
+    assert result == VALID
+    assert len(prompts) == 2
+    assert "не прошёл проверку" in prompts[1]
+
+
+def test_agent_does_not_reprompt_repairable_output(monkeypatch):
+    prompts = mock_outputs(monkeypatch, [f"```json\n{TEXT}\n```"])
+    assert asyncio.run(project_manager.project_manager_agent("Сделать API")) == VALID
+    assert len(prompts) == 1
+
+
+def test_agent_gives_up_after_max_attempts(monkeypatch):
+    prompts = mock_outputs(monkeypatch, ["нет", "опять нет", "лишний"])
+    with pytest.raises(AgentOutputError):
+        asyncio.run(project_manager.project_manager_agent("Сделать API"))
+    assert len(prompts) == project_manager.settings.AGENT_MAX_ATTEMPTS
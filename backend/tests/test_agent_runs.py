@@ -0,0 +1,115 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.agents import project_manager
+from app.agents.backends import BackendUnavailableError
+from app.agents.http import AgentHTTPClient
+from app.models.agent_run import AgentRun
+from app.services.metrics import percentile
+
+SPLIT = '{"subtasks": [{"id": 1, "title": "T"}]}'
+
+
+def ollama_response(**stats) -> dict:
+    return {
+        "model": "gemma3:1b",
+        "response": SPLIT,
+        "done": True,
+        "load_duration": 500_000_000,
+        "prompt_eval_count": 40,
+        "prompt_eval_duration": 200_000_000,
+        "eval_count": 100,
+        "eval_duration": 2_000_000_000,
+        **stats,
+    }
+
+
+def mock_ollama(monkeypatch, handler):
+    monkeypatch.setattr(
+        project_manager.agent_backends,
+        "http",
+        AgentHTTPClient(transport=httpx.MockTransport(handler)),
+    )
+
+
+def test_agent_run_is_recorded(create_task, db, monkeypatch):
+    """Счётчики Ollama сохраняются в agent_runs и привязываются к задаче."""
+    task_id = create_task("Учёт", description="токенов")
+    mock_ollama(
+        monkeypatch, lambda request: httpx.Response(200, json=ollama_response())
+    )
+
+    asyncio.run(project_manager.project_manager_agent("Учёт токенов", task_id=task_id))
+
+    run = db.query(AgentRun).one()
+    assert run.task_id == task_id
+    assert run.agent == "project_manager"
+    assert run.model == "gemma3:1b"
+    assert (run.status, run.attempts) == ("ok", 1)
+    assert (run.prompt_eval_count, run.eval_count) == (40, 100)
+    assert run.load_seconds == pytest.approx(0.5)
+    assert run.eval_seconds == pytest.approx(2.0)
+    assert run.total_seconds >= run.queue_seconds >= 0
+
+
+def test_agent_run_counts_reprompts_and_errors(db, monkeypatch):
+    """Переспрашивание суммирует токены, неудачный вызов тоже записывается."""
+    responses = iter([ollama_response(response="не json"), ollama_response()])
+    mock_ollama(monkeypatch, lambda request: httpx.Response(200, json=next(responses)))
+    asyncio.run(project_manager.project_manager_agent("Переспросить"))
+
+    mock_ollama(monkeypatch, lambda request: httpx.Response(500))
+    with pytest.raises(BackendUnavailableError):
+        asyncio.run(project_manager.project_manager_agent("Упасть"))
+
+    ok, failed = db.query(AgentRun).order_by(AgentRun.id).all()
+    assert (ok.attempts, ok.eval_count) == (2, 200)
+    assert failed.status == "error"
+    assert failed.attempts == 0
+    assert failed.error
+
+
+def test_agent_runs_summary(client, auth_token, admin_token, db):
+    """Агрегаты по моделям доступны только администратору."""
+    durations = [1.0, 2.0, 3.0, 4.0]
+    db.add_all(
+        [
+            AgentRun(
+                agent="project_manager",
+                model="gemma3:1b",
+                status="ok",
+                attempts=1,
+                total_seconds=seconds,
+                prompt_eval_count=50,
+                prompt_eval_seconds=0.5,
+                eval_count=100,
+                eval_seconds=seconds,
+            )
+            for seconds in durations
+        ]
+        + [AgentRun(agent="project_manager", model="llama3", status="error")]
+    )
+    db.commit()
+
+    response = client.get(
+        "/metrics/agent-runs", headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert response.status_code == 403
+
+    response = client.get(
+        "/metrics/agent-runs", headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["runs"] == 5
+    gemma = body["models"]["gemma3:1b"]
+    assert gemma["runs"] == 4 and gemma["errors"] == 0
+    assert gemma["latency_p50"] == percentile(durations, 50)
+    assert gemma["latency_p95"] == 4.0
+    assert gemma["eval_tokens_per_second"] == pytest.approx(400 / 10)
+    assert gemma["prompt_tokens_per_second"] == pytest.approx(100)
+    llama = body["models"]["llama3"]
+    assert llama["errors"] == 1
+    assert llama["latency_p50"] is None
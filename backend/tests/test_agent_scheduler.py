@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from app.agents import project_manager
+from app.agents.scheduler import AgentOverloadedError, FairScheduler
+
+
+def test_free_slot_goes_to_least_served_user():
+    """Всплеск одного пользователя не обгоняет запрос другого."""
+    order = []
+
+    async def scenario():
+        scheduler = FairScheduler(max_in_flight=1, max_queue=10, retry_after=1)
+        gate = asyncio.Event()
+
+        async def job(user, name):
+            async with scheduler.slot(user):
+                order.append(name)
+                await gate.wait()
+
+        tasks = [asyncio.create_task(job("a", "a1"))]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(job("a", f"a{i}")) for i in (2, 3)]
+        tasks.append(asyncio.create_task(job("b", "b1")))
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queued"] == 3
+        gate.set()
+        await asyncio.gather(*tasks)
+        assert scheduler.in_flight == 0
+        assert scheduler.wait_time.count == 4
+
+    asyncio.run(scenario())
+    assert order == ["a1", "b1", "a2", "a3"]
+
+
+def test_full_queue_fails_fast():
+    async def scenario():
+        scheduler = FairScheduler(max_in_flight=1, max_queue=1, retry_after=7)
+        await scheduler.acquire("a")
+        waiter = asyncio.create_task(scheduler.acquire("b"))
+        await asyncio.sleep(0)
+        with pytest.raises(AgentOverloadedError) as exc:
+            await scheduler.acquire("c")
+        assert exc.value.retry_after == 7
+        assert scheduler.rejected == 1
+        scheduler.release("a")
+        await waiter
+        scheduler.release("b")
+        assert scheduler.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_queue():
+    async def scenario():
+        scheduler = FairScheduler(max_in_flight=1, max_queue=5, retry_after=1)
+        await scheduler.acquire("a")
+        waiter = asyncio.create_task(scheduler.acquire("b"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.queued == 0
+        scheduler.release("a")
+        assert scheduler.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_stream_split_returns_429_when_overloaded(client, auth_token, monkeypatch):
+    scheduler = FairScheduler(max_in_flight=0, max_queue=0, retry_after=3)
+    monkeypatch.setattr(project_manager, "agent_scheduler", scheduler)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    task_id = client.post("/tasks/", json={"title": "API"}, headers=headers).json()[
+        "id"
+    ]
+    response = client.post(f"/tasks/{task_id}/split/stream", headers=headers)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
@@ -0,0 +1,24 @@
+from app.database import make_async_url
+
+
+def test_make_async_url():
+    """Синхронные драйверы заменяются на asyncpg и aiosqlite."""
+    assert (
+        make_async_url("postgresql://user:secret@db:5432/app")
+        == "postgresql+asyncpg://user:secret@db:5432/app"
+    )
+    assert make_async_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    assert (
+        make_async_url("postgresql+asyncpg://db/app") == "postgresql+asyncpg://db/app"
+    )
+
+
+def test_get_subtasks_without_lazy_load(client, auth_token):
+    """Подзадачи читаются явным запросом, а не ленивой загрузкой."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    task_id = client.post("/tasks/", json={"title": "Parent"}, headers=headers).json()[
+        "id"
+    ]
+    response = client.get(f"/tasks/{task_id}/subtasks", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == []
@@ -1,3 +1,7 @@
+from app.core.security import token_digest
+from app.models.token import RefreshToken
+
+
 def test_login_success(client, test_user):
     """Проверка регистрации."""
     client.post("/users/", json=test_user)
@@ -17,3 +21,26 @@ def test_login_invalid_password(client, test_user):
         "/auth/login", data={"username": test_user["email"], "password": "wrong"}
     )
     assert response.status_code == 401
+
+
+def test_refresh_token_is_stored_as_hash(client, test_user, db):
+    """В БД лежит только SHA-256 refresh-токена, поиск по нему работает."""
+    client.post("/users/", json=test_user)
+    response = client.post(
+        "/auth/login",
+        data={"username": test_user["email"], "password": test_user["password"]},
+    )
+    refresh_token = response.json()["refresh_token"]
+    assert db.query(RefreshToken.token_hash).scalar() == token_digest(refresh_token)
+
+    headers = {"Authorization": f"Bearer {refresh_token}"}
+    response = client.post("/auth/refresh", headers=headers)
+    assert response.status_code == 200
+    new_token = response.json()["refresh_token"]
+    stored = [token_hash for (token_hash,) in db.query(RefreshToken.token_hash)]
+    assert stored == [token_digest(new_token)]
+    assert new_token not in stored
+    assert client.post("/auth/refresh", headers=headers).status_code == 401
+
+    new_headers = {"Authorization": f"Bearer {new_token}"}
+    assert client.post("/auth/refresh", headers=new_headers).status_code == 200
@@ -0,0 +1,120 @@
+from app.core.config import settings
+
+
+def test_bulk_create(client, auth_headers):
+    """Пакет создаётся INSERT ... RETURNING, результаты в порядке запроса."""
+    assert client.get("/tasks/", headers=auth_headers).json() == []
+    items = [{"title": f"Task {i}"} for i in range(5)]
+    response = client.post("/tasks/bulk", json={"items": items}, headers=auth_headers)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["index"] for r in results] == list(range(5))
+    assert [r["task"]["title"] for r in results] == [i["title"] for i in items]
+    assert all(r["ok"] for r in results)
+    # В SQLite порядок RETURNING обеспечивается вставкой по строке.
+    assert response.headers["X-Query-Count"] == str(len(items))
+    assert len(client.get("/tasks/", headers=auth_headers).json()) == 5
+
+
+def test_bulk_create_rejects_foreign_parent(client, auth_headers, create_task):
+    parent_id = create_task("P")
+    items = [
+        {"title": "child", "parent_task_id": parent_id},
+        {"title": "orphan", "parent_task_id": parent_id + 100},
+    ]
+    results = client.post(
+        "/tasks/bulk", json={"items": items}, headers=auth_headers
+    ).json()["results"]
+    assert results[0]["ok"] and results[0]["task"]["parent_task_id"] == parent_id
+    assert not results[1]["ok"]
+    assert results[1]["error"] == "Parent task not found"
+
+
+def test_bulk_update_and_delete(client, auth_headers):
+    results = client.post(
+        "/tasks/bulk",
+        json={"items": [{"title": "a"}, {"title": "b"}]},
+        headers=auth_headers,
+    ).json()["results"]
+    ids = [r["id"] for r in results]
+
+    response = client.patch(
+        "/tasks/bulk",
+        json={
+            "items": [
+                {"id": ids[0], "status": "done"},
+                {"id": ids[1], "title": "B"},
+                {"id": 999999, "title": "missing"},
+            ]
+        },
+        headers=auth_headers,
+    )
+    results = response.json()["results"]
+    assert results[0]["task"]["status"] == "done"
+    assert results[1]["task"]["title"] == "B"
+    assert results[2] == {
+        "index": 2,
+        "id": 999999,
+        "ok": False,
+        "error": "Task not found",
+        "task": None,
+    }
+
+    response = client.request(
+        "DELETE", "/tasks/bulk", json={"ids": [ids[0], 999999]}, headers=auth_headers
+    )
+    assert [r["ok"] for r in response.json()["results"]] == [True, False]
+    assert response.headers["X-Query-Count"] == "1"
+    assert [t["id"] for t in client.get("/tasks/", headers=auth_headers).json()] == [
+        ids[1]
+    ]
+
+
+def test_bulk_create_keeps_request_order(client, auth_headers):
+    titles = [f"t{i}" for i in range(20)]
+    results = client.post(
+        "/tasks/bulk",
+        json={"items": [{"title": title} for title in titles]},
+        headers=auth_headers,
+    ).json()["results"]
+    assert [r["task"]["title"] for r in results] == titles
+
+
+def test_bulk_update_rejects_null_title(client, auth_headers, create_task):
+    task_id = create_task(title="Задача")
+    response = client.patch(
+        "/tasks/bulk",
+        json={"items": [{"id": task_id, "title": None}]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 422
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).json()["title"] == (
+        "Задача"
+    )
+
+
+def test_bulk_foreign_tasks_untouched(client, auth_headers, other_headers, create_task):
+    task_id = create_task("Mine")
+    results = client.patch(
+        "/tasks/bulk",
+        json={"items": [{"id": task_id, "title": "Hacked"}]},
+        headers=other_headers,
+    ).json()["results"]
+    assert not results[0]["ok"]
+    results = client.request(
+        "DELETE", "/tasks/bulk", json={"ids": [task_id]}, headers=other_headers
+    ).json()["results"]
+    assert not results[0]["ok"]
+    assert (
+        client.get(f"/tasks/{task_id}", headers=auth_headers).json()["title"] == "Mine"
+    )
+
+
+def test_bulk_size_limit(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "TASK_BULK_MAX_ITEMS", 2)
+    response = client.post(
+        "/tasks/bulk",
+        json={"items": [{"title": "x"}] * 3},
+        headers=auth_headers,
+    )
+    assert response.status_code == 413
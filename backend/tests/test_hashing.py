@@ -0,0 +1,39 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.security import password_hasher
+from app.services.hashing import BoundedExecutor, ExecutorSaturatedError
+
+
+def test_bounded_executor_rejects_when_full():
+    """Вызов сверх лимита очереди отклоняется сразу."""
+    executor = BoundedExecutor(max_workers=1, max_pending=1, name="test-pool")
+
+    async def scenario():
+        slow = asyncio.create_task(executor.run(time.sleep, 0.1))
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(time.sleep, 0)
+        await slow
+
+    asyncio.run(scenario())
+    assert executor.rejected == 1
+    executor.shutdown()
+
+
+def test_login_returns_503_when_hashing_saturated(client, test_user):
+    """Переполненный пул хеширования отвечает 503 с Retry-After."""
+    client.post("/users/", json=test_user)
+    max_pending = password_hasher.max_pending
+    password_hasher.max_pending = 0
+    try:
+        response = client.post(
+            "/auth/login",
+            data={"username": test_user["email"], "password": test_user["password"]},
+        )
+    finally:
+        password_hasher.max_pending = max_pending
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
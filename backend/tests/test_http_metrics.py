@@ -0,0 +1,69 @@
+import re
+
+from app.services.http_metrics import RouteMetrics, route_metrics
+
+
+def test_requests_are_grouped_by_route_template(client, auth_token):
+    """Серии метрик по шаблону маршрута, а не по сырому пути."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    ids = [
+        client.post("/tasks/", json={"title": t}, headers=headers).json()["id"]
+        for t in ("a", "b")
+    ]
+    route_metrics.reset()
+    for task_id in ids:
+        assert client.get(f"/tasks/{task_id}", headers=headers).status_code == 200
+    assert client.get("/tasks/999999", headers=headers).status_code == 404
+    client.get("/no-such-path")
+
+    body = client.get("/metrics").text
+    assert (
+        'http_requests_total{method="GET",route="/tasks/{task_id}",status="200"} 2'
+        in body
+    )
+    assert (
+        'http_requests_total{method="GET",route="/tasks/{task_id}",status="404"} 1'
+        in body
+    )
+    assert 'route="unmatched",status="404"' in body
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert (
+        'http_request_duration_seconds_bucket{method="GET",'
+        'route="/tasks/{task_id}",status="200",le="+Inf"} 2' in body
+    )
+    assert f"/tasks/{ids[0]}" not in body
+
+
+def test_server_timing_splits_auth_and_db(client, auth_token):
+    response = client.get("/tasks/", headers={"Authorization": f"Bearer {auth_token}"})
+    timing = dict(re.findall(r"(\w+);dur=([\d.]+)", response.headers["Server-Timing"]))
+    assert set(timing) == {"auth", "db", "llm", "total"}
+    assert float(timing["db"]) > 0
+    assert float(timing["llm"]) == 0
+    assert float(timing["total"]) >= float(timing["auth"])
+
+
+def test_route_cache_checks_prefix():
+    """Кэш по объекту маршрута не путает один роутер под разными префиксами."""
+
+    class Route:
+        path_format = "/{task_id}"
+
+    metrics = RouteMetrics()
+    for path in ("/tasks/1", "/tasks/2", "/ai/tasks/3"):
+        scope = {
+            "method": "GET",
+            "path": path,
+            "route": Route,
+            "path_params": {"task_id": path.rsplit("/", 1)[1]},
+        }
+        metrics.observe_request(scope, 200, 0.01)
+    body = metrics.render()
+    assert (
+        'http_requests_total{method="GET",route="/tasks/{task_id}",status="200"} 2'
+        in body
+    )
+    assert (
+        'http_requests_total{method="GET",route="/ai/tasks/{task_id}",status="200"} 1'
+        in body
+    )
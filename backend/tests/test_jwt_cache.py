@@ -0,0 +1,44 @@
+import time
+from datetime import timedelta
+
+import pytest
+from jose import JWTError
+
+from app.core import security
+from app.core.security import create_access_token, decode_jwt, jwt_claims_cache
+
+
+def test_verified_claims_are_cached():
+    """Повторная проверка того же токена берёт claims из кэша."""
+    token = create_access_token({"sub": "1"})
+    claims = decode_jwt(token)
+    claims["sub"] = "2"
+    assert decode_jwt(token)["sub"] == "1"
+    assert jwt_claims_cache.stats()["hits"] == 1
+    assert len(jwt_claims_cache) == 1
+
+
+def test_cached_claims_expire_with_token():
+    """Запись живёт не дольше exp токена, даже если TTL кэша больше."""
+    token = create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=5))
+    claims = decode_jwt(token)
+    until_exp = claims["exp"] - time.time()
+    ((expires_at, _),) = jwt_claims_cache._data.values()
+    assert expires_at - time.monotonic() <= until_exp + 0.01
+    assert jwt_claims_cache.ttl > 5
+
+
+def test_invalid_tokens_are_not_cached():
+    with pytest.raises(JWTError):
+        decode_jwt(create_access_token({"sub": "1"}) + "x")
+    assert len(jwt_claims_cache) == 0
+
+
+def test_secret_key_change_drops_cache(monkeypatch):
+    """После смены SECRET_KEY старые токены не принимаются даже из кэша."""
+    token = create_access_token({"sub": "1"})
+    decode_jwt(token)
+    monkeypatch.setattr(security.settings, "SECRET_KEY", "rotated-secret-key")
+    with pytest.raises(JWTError):
+        decode_jwt(token)
+    assert len(jwt_claims_cache) == 0
@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.models.task import Task
+from app.models.token import RefreshToken
+from app.models.user import User
+from app.services import maintenance
+
+
+def add_user(db, email, active=False, age_hours=0.0, with_task=False) -> User:
+    user = User(
+        email=email,
+        hashed_password="x",
+        is_active=active,
+        confirmation_token=None if active else f"confirm-{email}",
+        created_at=datetime.now(timezone.utc) - timedelta(hours=age_hours),
+    )
+    db.add(user)
+    db.flush()
+    if with_task:
+        db.add(Task(title="t", user_id=user.id))
+    return user
+
+
+def test_sweeper_removes_expired_tokens_in_batches(db, sweeper, monkeypatch):
+    """Истёкшие токены удаляются пачками, действующие остаются."""
+    monkeypatch.setattr(maintenance.settings, "MAINTENANCE_BATCH_SIZE", 2)
+    user = add_user(db, "tokens@example.com", active=True)
+    now = datetime.now(timezone.utc)
+    db.add_all(
+        RefreshToken(
+            user_id=user.id,
+            token_hash=f"{i:064d}",
+            expires_at=now + timedelta(days=1 if i == 0 else -i),
+        )
+        for i in range(5)
+    )
+    db.commit()
+
+    removed = asyncio.run(sweeper.run_once())
+
+    assert removed["refresh_tokens"] == 4
+    assert db.query(RefreshToken).count() == 1
+    assert sweeper.stats()["last_run"]["removed"] == removed
+
+
+def test_sweeper_removes_only_stale_unconfirmed_users(db, sweeper, monkeypatch):
+    """Удаляются старые неподтверждённые аккаунты без задач и сессий с токенами."""
+    monkeypatch.setattr(maintenance.settings, "UNCONFIRMED_USER_RETENTION_HOURS", 24)
+    monkeypatch.setattr(maintenance.settings, "EXPIRED_TOKEN_RETENTION_HOURS", 24)
+    stale = add_user(db, "stale@example.com", age_hours=48)
+    add_user(db, "fresh@example.com", age_hours=1)
+    add_user(db, "busy@example.com", age_hours=48, with_task=True)
+    add_user(db, "confirmed@example.com", active=True, age_hours=48)
+    online = add_user(db, "online@example.com", age_hours=48)
+    now = datetime.now(timezone.utc)
+    db.add_all(
+        [
+            RefreshToken(
+                user_id=stale.id,
+                token_hash="e" * 64,
+                expires_at=now - timedelta(hours=1),
+            ),
+            RefreshToken(
+                user_id=online.id,
+                token_hash="f" * 64,
+                expires_at=now + timedelta(days=1),
+            ),
+        ]
+    )
+    db.commit()
+
+    removed = asyncio.run(sweeper.run_once())
+
+    assert removed == {"refresh_tokens": 0, "users": 1}
+    db.expire_all()
+    emails = {email for (email,) in db.query(User.email)}
+    assert emails == {
+        "fresh@example.com",
+        "busy@example.com",
+        "confirmed@example.com",
+        "online@example.com",
+    }
+    assert [user_id for (user_id,) in db.query(RefreshToken.user_id)] == [online.id]
+    assert sweeper.stats()["removed_total"]["users"] == 1
@@ -0,0 +1,42 @@
+from sqlalchemy import create_engine, text
+
+from app.services.db_pool import TimedQueuePool, pool_status
+from app.services.metrics import Histogram
+
+
+def test_histogram_snapshot_is_cumulative():
+    """Счётчики корзин накопительные, последняя корзина +Inf."""
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"0.1": 1, "1.0": 2, "+Inf": 3}
+    assert snapshot["count"] == 3
+
+
+def test_pool_status_reports_checkouts(tmp_path):
+    """Пул считает выданные соединения и время ожидания."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db", poolclass=TimedQueuePool, pool_size=2
+    )
+    waits = TimedQueuePool.wait_time.count
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        status = pool_status(engine)
+        assert status["checked_out"] == 1
+    assert pool_status(engine)["idle"] == 1
+    assert TimedQueuePool.wait_time.count == waits + 1
+    engine.dispose()
+
+
+def test_db_metrics_requires_admin(client, auth_token, admin_token):
+    """Метрики пула доступны только администратору."""
+    response = client.get(
+        "/metrics/db", headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert response.status_code == 403
+    response = client.get(
+        "/metrics/db", headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 200
+    assert "checked_out" in response.json()["async"]
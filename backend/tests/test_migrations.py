@@ -0,0 +1,78 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.security import token_digest
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+def test_migrations_match_models(tmp_path):
+    """Миграции до head дают ту же схему, что и модели."""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{tmp_path}/migrated.db")
+    command.upgrade(config, "head")
+    command.check(config)
+    command.downgrade(config, "base")
+
+
+def test_refresh_tokens_migrate_to_hashes(tmp_path):
+    """Существующие refresh-токены после миграции находятся по хешу."""
+    url = f"sqlite:///{tmp_path}/tokens.db"
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "0005")
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO users (id, email, hashed_password) "
+                "VALUES (1, 'm@example.com', 'x')"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO refresh_tokens (user_id, token, expires_at) "
+                "VALUES (1, 'old-token', '2100-01-01 00:00:00')"
+            )
+        )
+
+    command.upgrade(config, "head")
+    with engine.connect() as conn:
+        columns = {c["name"] for c in inspect(conn).get_columns("refresh_tokens")}
+        stored = conn.execute(text("SELECT token_hash FROM refresh_tokens")).scalar()
+    assert "token" not in columns
+    assert stored == token_digest("old-token")
+    engine.dispose()
+
+
+def test_search_index_backfilled(tmp_path):
+    """Миграция 0008 индексирует уже существующие задачи."""
+    url = f"sqlite:///{tmp_path}/search.db"
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "0007")
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO users (id, email, hashed_password) "
+                "VALUES (1, 's@example.com', 'x')"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO tasks (id, title, user_id) VALUES (7, 'Старая задача', 1)"
+            )
+        )
+
+    command.upgrade(config, "head")
+    with engine.connect() as conn:
+        found = conn.execute(
+            text("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'старая'")
+        ).scalar()
+    assert found == 7
+    engine.dispose()
+    command.downgrade(config, "0007")
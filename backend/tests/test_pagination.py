@@ -0,0 +1,52 @@
+from app.core.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+
+
+def test_cursor_roundtrip():
+    """Курсор кодирует id последней записи."""
+    assert decode_cursor(encode_cursor(42)) == 42
+
+
+def test_tasks_keyset_pagination(client, auth_token):
+    """Страницы по курсору идут подряд и без повторов."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    created = [
+        client.post("/tasks/", json={"title": f"Task {i}"}, headers=headers).json()[
+            "id"
+        ]
+        for i in range(5)
+    ]
+    seen = []
+    cursor = None
+    for expected in (2, 2, 1):
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/tasks/", params=params, headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()) == expected
+        seen += [task["id"] for task in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+    assert cursor is None
+    assert seen == created
+
+
+def test_invalid_cursor(client, auth_token):
+    """Повреждённый курсор — 400."""
+    response = client.get(
+        "/tasks/",
+        params={"cursor": "not-a-cursor"},
+        headers={"Authorization": f"Bearer {auth_token}"},
+    )
+    assert response.status_code == 400
+
+
+def test_page_size_is_validated(client, auth_headers, admin_token):
+    """limit вне 1..MAX_PAGE_SIZE и отрицательный skip — 422."""
+    admin_headers = {"Authorization": f"Bearer {admin_token}"}
+    for url, headers in (("/tasks/", auth_headers), ("/users/", admin_headers)):
+        for params in (
+            {"limit": 0},
+            {"limit": -1},
+            {"limit": MAX_PAGE_SIZE + 1},
+            {"skip": -1},
+        ):
+            response = client.get(url, params=params, headers=headers)
+            assert response.status_code == 422, (url, params)
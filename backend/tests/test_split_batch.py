@@ -0,0 +1,68 @@
+import asyncio
+
+from app.agents.scheduler import AgentOverloadedError
+from app.routers import tasks
+
+
+def test_split_batch_runs_concurrently(client, auth_token, sql_statements, monkeypatch):
+    """Задачи разбиваются параллельно, подзадачи пишутся одним пакетом."""
+    running = 0
+    peak = 0
+
+    async def agent(description, user_id=None, task_id=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if description.startswith("broken"):
+            raise AgentOverloadedError(1)
+        title = description.split(":")[0]
+        return {
+            "reasoning_log": [],
+            "subtasks": [
+                {"title": f"{title}.{i}", "description": "d"} for i in range(2)
+            ],
+        }
+
+    monkeypatch.setattr(tasks, "project_manager_agent", agent)
+    monkeypatch.setattr(tasks.settings, "SPLIT_BATCH_CONCURRENCY", 2)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    ids = [
+        client.post("/tasks/", json={"title": title}, headers=headers).json()["id"]
+        for title in ("one", "two", "three", "broken")
+    ]
+
+    sql_statements.clear()
+    response = client.post(
+        "/tasks/split-batch",
+        json={"task_ids": [*ids, ids[0], 999999]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    body = response.json()
+    results = body["results"]
+    assert [r["task_id"] for r in results] == [*ids, 999999]
+    assert [r["ok"] for r in results] == [True, True, True, False, False]
+    assert [s["title"] for s in results[1]["subtasks"]] == ["two.0", "two.1"]
+    assert results[3]["error"] == "LLM backend is overloaded"
+    assert results[4]["error"] == "Task not found"
+    assert all(r["seconds"] > 0 for r in results[:4])
+    assert body["seconds"] > 0
+    assert peak == 2
+    inserts = [s for s in sql_statements if s.startswith("INSERT INTO subtasks")]
+    # В SQLite порядок RETURNING обеспечивается вставкой по строке.
+    assert len(inserts) == sum(len(r["subtasks"]) for r in results)
+
+    saved = client.get(f"/tasks/{ids[2]}/subtasks", headers=headers).json()
+    assert [s["title"] for s in saved] == ["three.0", "three.1"]
+
+
+def test_split_batch_size_limit(client, auth_token, monkeypatch):
+    monkeypatch.setattr(tasks.settings, "SPLIT_BATCH_MAX_TASKS", 1)
+    response = client.post(
+        "/tasks/split-batch",
+        json={"task_ids": [1, 2]},
+        headers={"Authorization": f"Bearer {auth_token}"},
+    )
+    assert response.status_code == 413
@@ -0,0 +1,148 @@
+import asyncio
+
+from app.services import split_jobs
+
+ANSWER = {
+    "reasoning_log": ["Шаг 1"],
+    "subtasks": [
+        {"id": 1, "title": "Схема", "description": "Таблицы"},
+        {"id": 2, "title": "API", "description": "Роуты"},
+    ],
+}
+
+
+def test_split_is_queued_and_processed(
+    client, auth_headers, create_task, split_worker, monkeypatch
+):
+    """Запрос сразу получает id задания, подзадачи пишет воркер."""
+    calls = []
+
+    async def agent(description, user_id=None, task_id=None):
+        calls.append(description)
+        return ANSWER
+
+    monkeypatch.setattr(split_jobs.project_manager, "project_manager_agent", agent)
+    task_id = create_task("API")
+
+    response = client.post(f"/tasks/{task_id}/split", headers=auth_headers)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+    assert response.headers["Location"] == f"/jobs/{job['id']}"
+    assert calls == []
+
+    assert asyncio.run(split_worker.run_once()) is True
+    assert asyncio.run(split_worker.run_once()) is False
+
+    job = client.get(f"/jobs/{job['id']}", headers=auth_headers).json()
+    assert job["status"] == "done"
+    assert job["result"] == ANSWER
+    assert job["finished_at"] is not None
+    subtasks = client.get(f"/tasks/{task_id}/subtasks", headers=auth_headers).json()
+    assert [sub["title"] for sub in subtasks] == ["Схема", "API"]
+
+
+def test_failed_split_is_reported(
+    client, auth_headers, create_task, split_worker, monkeypatch
+):
+    async def agent(description, user_id=None, task_id=None):
+        raise RuntimeError("LLM недоступна")
+
+    monkeypatch.setattr(split_jobs.project_manager, "project_manager_agent", agent)
+    task_id = create_task("API")
+    job_id = client.post(f"/ai/tasks/{task_id}/split", headers=auth_headers).json()[
+        "id"
+    ]
+
+    asyncio.run(split_worker.run_once())
+
+    job = client.get(f"/jobs/{job_id}", headers=auth_headers).json()
+    assert job["status"] == "failed"
+    assert job["error"] == "LLM недоступна"
+    assert client.get(f"/tasks/{task_id}/subtasks", headers=auth_headers).json() == []
+
+
+def test_split_of_deleted_task_does_not_stick(
+    client, auth_headers, create_task, split_worker, monkeypatch
+):
+    """Задачу удалили во время генерации: воркер не падает и отпускает задание."""
+    task_id = create_task("API")
+
+    async def agent(description, user_id=None, task_id=None):
+        client.delete(f"/tasks/{task_id}", headers=auth_headers)
+        return ANSWER
+
+    monkeypatch.setattr(split_jobs.project_manager, "project_manager_agent", agent)
+    job_id = client.post(f"/tasks/{task_id}/split", headers=auth_headers).json()["id"]
+
+    assert asyncio.run(split_worker.run_once()) is True
+    assert split_worker._running == set()
+    assert client.get(f"/jobs/{job_id}", headers=auth_headers).status_code == 404
+    assert asyncio.run(split_worker.run_once()) is False
+
+
+def test_unsaved_split_result_is_failed(
+    client, auth_headers, create_task, split_worker, monkeypatch
+):
+    """Результат не записался: задание помечается упавшим, подзадач нет."""
+
+    async def agent(description, user_id=None, task_id=None):
+        return {"subtasks": [{"title": "Схема"}]}
+
+    monkeypatch.setattr(split_jobs.project_manager, "project_manager_agent", agent)
+    task_id = create_task("API")
+    job_id = client.post(f"/tasks/{task_id}/split", headers=auth_headers).json()["id"]
+
+    assert asyncio.run(split_worker.run_once()) is True
+    assert split_worker._running == set()
+    job = client.get(f"/jobs/{job_id}", headers=auth_headers).json()
+    assert job["status"] == "failed"
+    assert job["error"] == "'description'"
+    assert client.get(f"/tasks/{task_id}/subtasks", headers=auth_headers).json() == []
+
+
+def test_stop_requeues_running_job(
+    client, auth_headers, create_task, split_worker, monkeypatch
+):
+    """Задание, прерванное остановкой воркеров, возвращается в очередь."""
+    started = asyncio.Event()
+
+    async def agent(description, user_id=None, task_id=None):
+        started.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(split_jobs.project_manager, "project_manager_agent", agent)
+    task_id = create_task("API")
+    job_id = client.post(f"/tasks/{task_id}/split", headers=auth_headers).json()["id"]
+
+    async def scenario():
+        await split_worker.start(1)
+        await asyncio.wait_for(started.wait(), 5)
+        await split_worker.stop()
+
+    asyncio.run(scenario())
+
+    job = client.get(f"/jobs/{job_id}", headers=auth_headers).json()
+    assert job["status"] == "queued"
+    assert job["started_at"] is None
+    assert split_worker._running == set()
+
+
+def test_jobs_are_owner_scoped(client, auth_headers, create_task, other_headers):
+    task_id = create_task("API")
+    job_id = client.post(f"/tasks/{task_id}/split", headers=auth_headers).json()["id"]
+    assert client.get(f"/jobs/{job_id}", headers=other_headers).status_code == 404
+    response = client.post(f"/tasks/{task_id}/split", headers=other_headers)
+    assert response.status_code == 404
+
+
+def test_workers_start_and_stop(split_worker, monkeypatch):
+    """Воркеры запускаются в фоне и останавливаются без зависаний."""
+
+    async def scenario():
+        await split_worker.start(2)
+        assert len(split_worker._tasks) == 2
+        await split_worker.stop()
+        assert split_worker._tasks == []
+
+    asyncio.run(scenario())
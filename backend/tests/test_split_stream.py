@@ -0,0 +1,130 @@
+import json
+
+import httpx
+
+from app.agents import project_manager
+from app.agents.http import AgentHTTPClient
+from app.agents.streaming import SubtaskStreamParser, time_to_first_subtask
+from app.routers import tasks
+
+ANSWER = {
+    "reasoning_log": ["Шаг 1: {разобрать} [задачу]"],
+    "subtasks": [
+        {"id": 1, "title": "Схема }", "description": "Таблицы"},
+        {"id": 2, "title": "API", "description": 'Роуты \\" ]'},
+    ],
+}
+
+
+def test_parser_emits_subtasks_as_they_close():
+    """Подзадача отдаётся сразу после закрывающей скобки своего объекта."""
+    text = json.dumps(ANSWER, ensure_ascii=False)
+    first_end = text.index('"Таблицы"}') + len('"Таблицы"}')
+    parser = SubtaskStreamParser()
+    assert parser.feed(text[: first_end - 1]) == []
+    assert parser.feed(text[first_end - 1 : first_end]) == [ANSWER["subtasks"][0]]
+    assert parser.feed(text[first_end:]) == [ANSWER["subtasks"][1]]
+    assert parser.result() == ANSWER
+
+
+def test_parser_skips_invalid_key_escape():
+    """Ключ с неверным экранированием не обрывает разбор потока."""
+    parser = SubtaskStreamParser()
+    assert parser.feed('{"a\\q": 1, "subtasks": [{"title": "T"}') == [{"title": "T"}]
+    assert parser.result() is None
+
+
+def ollama_stream(text: str, chunk: int = 7) -> bytes:
+    lines = [
+        json.dumps({"response": text[i : i + chunk], "done": False})
+        for i in range(0, len(text), chunk)
+    ]
+    lines.append(json.dumps({"response": "", "done": True}))
+    return "\n".join(lines).encode()
+
+
+def parse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data[6:])))
+    return events
+
+
+def test_split_stream_persists_subtasks(client, auth_token, monkeypatch):
+    monkeypatch.setattr(
+        project_manager.agent_backends,
+        "http",
+        AgentHTTPClient(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(
+                    200, content=ollama_stream(json.dumps(ANSWER, ensure_ascii=False))
+                )
+            )
+        ),
+    )
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    task_id = client.post("/tasks/", json={"title": "API"}, headers=headers).json()[
+        "id"
+    ]
+    observed = time_to_first_subtask.count
+
+    response = client.post(f"/tasks/{task_id}/split/stream", headers=headers)
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert [event for event, _ in events] == ["subtask", "subtask", "done"]
+    assert events[0][1]["title"] == "Схема }"
+    assert events[0][1]["task_id"] == task_id
+    assert events[2][1] == {"count": 2, "reasoning_log": ANSWER["reasoning_log"]}
+    assert time_to_first_subtask.count == observed + 1
+
+    saved = client.get(f"/tasks/{task_id}/subtasks", headers=headers).json()
+    assert [sub["title"] for sub in saved] == ["Схема }", "API"]
+
+
+def test_split_stream_reports_llm_error(client, auth_token, monkeypatch):
+    monkeypatch.setattr(
+        project_manager.agent_backends,
+        "http",
+        AgentHTTPClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(503))
+        ),
+    )
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    task_id = client.post("/tasks/", json={"title": "API"}, headers=headers).json()[
+        "id"
+    ]
+    response = client.post(f"/tasks/{task_id}/split/stream", headers=headers)
+    [(event, data)] = parse_events(response.text)
+    assert event == "error"
+    assert data["count"] == 0
+    assert client.get(f"/tasks/{task_id}/subtasks", headers=headers).json() == []
+
+
+def test_split_stream_releases_connection_during_generation(
+    client, auth_headers, create_task, open_connections, monkeypatch
+):
+    """Пока идёт генерация, поток не держит соединение с БД."""
+    held = []
+
+    async def agent(description, user_id=None, task_id=None):
+        held.append(open_connections())
+        yield "start", {}
+        held.append(open_connections())
+        yield "subtask", {"title": "T", "description": "d"}
+        yield "done", {"reasoning_log": []}
+
+    monkeypatch.setattr(tasks, "project_manager_agent_stream", agent)
+    task_id = create_task("API")
+
+    response = client.post(f"/tasks/{task_id}/split/stream", headers=auth_headers)
+    assert [event for event, _ in parse_events(response.text)] == ["subtask", "done"]
+    assert held == [0, 0]
+
+
+def test_split_stream_foreign_task(client, auth_token):
+    response = client.post(
+        "/tasks/999999/split/stream",
+        headers={"Authorization": f"Bearer {auth_token}"},
+    )
+    assert response.status_code == 404
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.crud.task import get_task_by_id_async
+from app.models.task import Subtask, Task
+from app.services import sql_profiler
+from app.services.sql_profiler import normalize_sql, track_queries
+from app.services.user_cache import user_cache
+
+
+def test_normalize_sql():
+    """Литералы, параметры и списки IN сворачиваются в плейсхолдеры."""
+    assert (
+        normalize_sql("SELECT *\n  FROM tasks WHERE id = ? AND title = 'a''b'")
+        == "SELECT * FROM tasks WHERE id = ? AND title = ?"
+    )
+    assert (
+        normalize_sql("SELECT * FROM tasks WHERE id IN (:id_1, :id_2, 3) LIMIT 10")
+        == "SELECT * FROM tasks WHERE id IN (?, ...) LIMIT ?"
+    )
+    assert normalize_sql("SELECT x::text FROM t WHERE a = $1") == (
+        "SELECT x::text FROM t WHERE a = ?"
+    )
+
+
+def test_n_plus_one_detected(client, auth_token, db):
+    """Ленивая загрузка подзадач в цикле помечается как N+1."""
+    user_id = client.get(
+        "/users/me", headers={"Authorization": f"Bearer {auth_token}"}
+    ).json()["id"]
+    db.add_all(
+        Task(
+            title=f"T{i}",
+            user_id=user_id,
+            ml_subtasks=[Subtask(title="S", description="d")],
+        )
+        for i in range(6)
+    )
+    db.commit()
+    db.expunge_all()
+
+    with track_queries() as stats:
+        tasks = db.scalars(select(Task).where(Task.user_id == user_id)).all()
+        for task in tasks:
+            assert len(task.ml_subtasks) == 1
+    assert stats.count == 7
+    [(sql, count, _)] = stats.n_plus_one()
+    assert count == 6
+    assert "FROM subtasks" in sql and "WHERE ? = subtasks.task_id" in sql
+
+    with track_queries() as stats:
+        for _ in range(6):
+            db.scalars(select(Task).where(Task.user_id == user_id)).all()
+    assert stats.n_plus_one() == []
+
+
+@pytest.fixture
+def slow_log(monkeypatch, caplog):
+    """Каждый запрос считается медленным."""
+    monkeypatch.setattr(sql_profiler.settings, "SQL_PROFILER_ENABLED", True)
+    monkeypatch.setattr(sql_profiler.settings, "SQL_SLOW_QUERY_MS", 0.0001)
+    # fileConfig в миграциях Alembic отключает уже созданные логгеры.
+    monkeypatch.setattr(sql_profiler.logger, "disabled", False)
+    caplog.set_level(logging.WARNING, logger=sql_profiler.__name__)
+    return caplog
+
+
+def test_slow_query_logged_with_call_site(slow_log):
+    """В асинхронной сессии место вызова ищется в родительском greenlet."""
+    engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+    sql_profiler.install(engine.sync_engine)
+
+    async def run():
+        async with AsyncSession(engine) as session:
+            await get_task_by_id_async(session, task_id=1)
+        await engine.dispose()
+
+    asyncio.run(run())
+    [message] = [
+        r.getMessage() for r in slow_log.records if "slow query" in r.getMessage()
+    ]
+    assert "app/crud/task.py" in message and "in get_task_by_id_async" in message
+    assert "WHERE tasks.id = ?" in message
+
+
+@pytest.mark.parametrize(
+    "path", ["/tasks/", "/tasks/{id}", "/tasks/{id}/subtasks", "/tasks/{id}/tree"]
+)
+def test_endpoint_query_budget(client, auth_token, path):
+    """Эндпоинты задач укладываются в бюджет даже без кэша пользователя."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    task_id = client.post("/tasks/", json={"title": "Бюджет"}, headers=headers).json()[
+        "id"
+    ]
+    user_cache.clear()
+
+    response = client.get(path.format(id=task_id), headers=headers)
+
+    assert response.status_code == 200
+    budget = int(response.headers["X-Query-Budget"])
+    assert int(response.headers["X-Query-Count"]) <= budget
@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+LAZY_MODULES = ("httpx", "passlib", "argon2", "pydoc")
+
+
+def loaded_lazy_modules(code: str, db_path: Path) -> list[str]:
+    """Ленивые модули, загруженные после выполнения code в чистом процессе."""
+    code += (
+        "\nimport json, sys"
+        f"\nprint(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        env={
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{db_path}",
+            "SECRET_KEY": "startup-secret-key",
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output)
+
+
+def test_import_is_lean_and_does_not_touch_db(tmp_path):
+    """Импорт app.main не создаёт схему и не тянет тяжёлые зависимости."""
+    db_path = tmp_path / "startup.db"
+    assert loaded_lazy_modules("import app.main", db_path) == []
+    assert not db_path.exists()
+
+
+def test_lifespan_startup_does_not_load_httpx(tmp_path):
+    """Фоновые задачи lifespan не создают HTTP-клиент агентов до запроса к LLM."""
+    code = """
+import asyncio
+from app.main import app, lifespan
+
+async def main():
+    async with lifespan(app):
+        await asyncio.sleep(0.1)
+
+asyncio.run(main())
+"""
+    assert "httpx" not in loaded_lazy_modules(code, tmp_path / "startup.db")
@@ -0,0 +1,63 @@
+from app.models.task import Subtask
+
+
+def search(client, headers, q, **params):
+    response = client.get("/tasks/search", params={"q": q, **params}, headers=headers)
+    assert response.status_code == 200
+    return response
+
+
+def test_search_ranked_and_scoped_to_owner(client, auth_token, admin_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for title, description in [
+        ("Миграция базы", "перенос базы на Postgres, база большая"),
+        ("Миграция логов", None),
+        ("Отчёт", "упомянуть базу"),
+    ]:
+        client.post(
+            "/tasks/",
+            json={"title": title, "description": description},
+            headers=headers,
+        )
+    client.post(
+        "/tasks/",
+        json={"title": "Миграция базы"},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+
+    response = search(client, headers, "миграция баз")
+    found = response.json()
+    assert [task["title"] for task in found] == ["Миграция базы"]
+    assert found[0]["rank"] > 0
+    assert int(response.headers["X-Query-Count"]) <= int(
+        response.headers["X-Query-Budget"]
+    )
+
+    titles = [task["title"] for task in search(client, headers, "миграция").json()]
+    assert sorted(titles) == ["Миграция базы", "Миграция логов"]
+    ranks = [task["rank"] for task in search(client, headers, "баз").json()]
+    assert len(ranks) == 2 and ranks == sorted(ranks, reverse=True)
+    assert search(client, headers, '"*) OR (').json() == []
+
+
+def test_search_index_follows_writes(client, auth_token, db):
+    """Индекс обновляется при изменении и удалении задач и подзадач."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    task_id = client.post(
+        "/tasks/", json={"title": "Черновик"}, headers=headers
+    ).json()["id"]
+    db.add(
+        Subtask(title="Настроить Kubernetes", description="кластер", task_id=task_id)
+    )
+    db.commit()
+
+    [found] = search(client, headers, "kubernetes").json()
+    assert found["id"] == task_id
+
+    client.put(f"/tasks/{task_id}", json={"title": "Релиз"}, headers=headers)
+    assert search(client, headers, "черновик").json() == []
+    assert [task["id"] for task in search(client, headers, "релиз").json()] == [task_id]
+
+    client.delete(f"/tasks/{task_id}", headers=headers)
+    assert search(client, headers, "kubernetes").json() == []
+    assert search(client, headers, "релиз").json() == []
@@ -0,0 +1,87 @@
+from sqlalchemy import text
+
+
+def add_subtask(db, task_id, title):
+    db.execute(
+        text(
+            "INSERT INTO subtasks (title, description, status, task_id) "
+            "VALUES (:title, 'generated', 'pending', :task_id)"
+        ),
+        {"title": title, "task_id": task_id},
+    )
+    db.commit()
+
+
+def build_tree(create_task, db, width, depth):
+    root = create_task("root")
+    level = [root]
+    for d in range(depth):
+        level = [
+            create_task(f"node {d}.{i}", parent_task_id=parent)
+            for parent in level
+            for i in range(width)
+        ]
+        for task_id in level:
+            add_subtask(db, task_id, f"sub of {task_id}")
+    return root
+
+
+def test_task_tree_shape(client, db, auth_headers, create_task):
+    """Дерево содержит детей и подзадачи, depth ограничивает глубину."""
+    root = build_tree(create_task, db, width=2, depth=2)
+    tree = client.get(f"/tasks/{root}/tree", headers=auth_headers).json()
+    assert len(tree["children"]) == 2
+    assert len(tree["children"][0]["children"]) == 2
+    assert len(tree["children"][0]["subtasks"]) == 1
+    shallow = client.get(
+        f"/tasks/{root}/tree", params={"depth": 1}, headers=auth_headers
+    ).json()
+    assert shallow["children"][0]["children"] == []
+
+
+def test_task_tree_constant_queries(
+    client, db, auth_headers, create_task, sql_statements
+):
+    """Число запросов не зависит от размера дерева."""
+    small = build_tree(create_task, db, width=1, depth=1)
+    large = build_tree(create_task, db, width=3, depth=3)
+    counts = []
+    for root in (small, large):
+        sql_statements.clear()
+        response = client.get(f"/tasks/{root}/tree", headers=auth_headers)
+        assert response.status_code == 200
+        counts.append(len(sql_statements))
+    assert counts == [2, 2]
+
+
+def test_task_tree_foreign_task(client, create_task, other_headers):
+    """Чужое дерево не отдаётся."""
+    root = create_task("mine")
+    response = client.get(f"/tasks/{root}/tree", headers=other_headers)
+    assert response.status_code == 404
+
+
+def test_task_tree_survives_cycles(client, db, auth_headers, create_task):
+    """Цикл в parent_task_id не ломает сериализацию дерева."""
+    root = create_task("root")
+    child = create_task("child", parent_task_id=root)
+    db.execute(
+        text("UPDATE tasks SET parent_task_id = :child WHERE id = :root"),
+        {"child": child, "root": root},
+    )
+    db.commit()
+    response = client.get(f"/tasks/{root}/tree", headers=auth_headers)
+    assert response.status_code == 200
+    tree = response.json()
+    assert [node["id"] for node in tree["children"]] == [child]
+    assert tree["children"][0]["children"] == []
+
+    db.execute(
+        text("UPDATE tasks SET parent_task_id = id WHERE id = :root"), {"root": root}
+    )
+    db.commit()
+    response = client.get(f"/tasks/{root}/tree", headers=auth_headers)
+    assert response.status_code == 200
+    tree = response.json()
+    assert [node["id"] for node in tree["children"]] == [child]
+    assert tree["children"][0]["children"] == []
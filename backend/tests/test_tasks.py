@@ -1,3 +1,6 @@
+from sqlalchemy import text
+
+
 def test_create_task(client, auth_token):
     """Создание задачи."""
     response = client.post(
@@ -46,3 +49,74 @@ def test_delete_task(client, auth_token):
     )
     assert delete_response.status_code == 200
     assert delete_response.json()["message"] == "Task deleted successfully"
+
+
+def test_task_writes_are_single_statement(client, auth_token):
+    """Обновление и удаление задачи — по одному SQL-запросу."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    task_id = client.post("/tasks/", json={"title": "One"}, headers=headers).json()[
+        "id"
+    ]
+    update_response = client.put(
+        f"/tasks/{task_id}", json={"status": "done"}, headers=headers
+    )
+    assert update_response.json()["status"] == "done"
+    assert update_response.headers["X-Query-Count"] == "1"
+    delete_response = client.delete(f"/tasks/{task_id}", headers=headers)
+    assert delete_response.status_code == 200
+    assert delete_response.headers["X-Query-Count"] == "1"
+
+
+def test_foreign_task_write_not_found(client, auth_headers, create_task, other_headers):
+    """Чужую задачу нельзя ни изменить, ни удалить."""
+    task_id = create_task("Mine")
+    response = client.put(
+        f"/tasks/{task_id}", json={"title": "Hacked"}, headers=other_headers
+    )
+    assert response.status_code == 404
+    response = client.delete(f"/tasks/{task_id}", headers=other_headers)
+    assert response.status_code == 404
+    response = client.get(f"/tasks/{task_id}", headers=auth_headers)
+    assert response.json()["title"] == "Mine"
+
+
+def test_create_task_checks_parent(client, auth_headers, create_task, other_headers):
+    """Родитель должен существовать и принадлежать тому же пользователю."""
+    foreign = client.post("/tasks/", json={"title": "Theirs"}, headers=other_headers)
+    for parent_task_id in (foreign.json()["id"], foreign.json()["id"] + 1000):
+        response = client.post(
+            "/tasks/",
+            json={"title": "Child", "parent_task_id": parent_task_id},
+            headers=auth_headers,
+        )
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Parent task not found"
+    parent = create_task("Mine")
+    response = client.post(
+        "/tasks/",
+        json={"title": "Child", "parent_task_id": parent},
+        headers=auth_headers,
+    )
+    assert response.json()["parent_task_id"] == parent
+
+
+def test_delete_task_cascades_to_subtasks(client, db, auth_token):
+    """Подзадачи удаляются вместе с задачей на стороне БД."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    task_id = client.post("/tasks/", json={"title": "Parent"}, headers=headers).json()[
+        "id"
+    ]
+    db.execute(
+        text(
+            "INSERT INTO subtasks (title, description, status, task_id) "
+            "VALUES ('s', 'd', 'pending', :task_id)"
+        ),
+        {"task_id": task_id},
+    )
+    db.commit()
+    client.delete(f"/tasks/{task_id}", headers=headers)
+    remaining = db.execute(
+        text("SELECT COUNT(*) FROM subtasks WHERE task_id = :task_id"),
+        {"task_id": task_id},
+    ).scalar()
+    assert remaining == 0
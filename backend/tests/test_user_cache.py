@@ -0,0 +1,41 @@
+import time
+
+from app.services.cache import TTLCache
+from app.services.user_cache import user_cache
+
+
+def test_ttl_cache_evicts_lru_and_expired():
+    """LRU-вытеснение и истечение TTL."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    cache.set("d", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("d") is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_current_user_is_cached(client, auth_token):
+    """Повторный запрос берёт пользователя из кэша."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    assert client.get("/users/me", headers=headers).status_code == 200
+    hits = user_cache.hits
+    assert client.get("/tasks/", headers=headers).status_code == 200
+    assert user_cache.hits == hits + 1
+
+
+def test_update_user_invalidates_cache(client, auth_token):
+    """После смены email кэш не отдаёт старые данные."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.get("/users/me", headers=headers)
+    response = client.put(
+        "/users/me", json={"email": "renamed@example.com"}, headers=headers
+    )
+    assert response.status_code == 200
+    me = client.get("/users/me", headers=headers)
+    assert me.json()["email"] == "renamed@example.com"